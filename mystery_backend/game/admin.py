@@ -1,43 +1,173 @@
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connection
+from django.utils.functional import cached_property
+from .config import DIFFICULTY_PROFILES
 from .models import Case, Suspect, Clue, ClueImplication, RedHerring
+from .utils.evidence_matrix import CATEGORIES
+
+
+class EstimatedCountPaginator(Paginator):
+    """Uses PostgreSQL's row estimate instead of COUNT(*) for unfiltered changelists on big tables."""
+
+    ESTIMATE_THRESHOLD = 100_000
+
+    @cached_property
+    def count(self):
+        query = self.object_list.query
+        if connection.vendor == 'postgresql' and not query.where:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT reltuples FROM pg_class WHERE relname = %s",
+                               [self.object_list.model._meta.db_table])
+                row = cursor.fetchone()
+            if row and row[0] >= self.ESTIMATE_THRESHOLD:
+                return int(row[0])
+        return super().count
+
+
+class ScalableAdmin(admin.ModelAdmin):
+    """Avoids full-table counts on every changelist page."""
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+class CaseFilter(admin.SimpleListFilter):
+    """
+    Filter by case without rendering every case in the sidebar: a case id box
+    with the admin's raw-id lookup popup, plus a link for the selected case.
+    """
+    title = 'case'
+    parameter_name = 'case'
+    template = 'admin/game/case_filter.html'
+
+    def has_output(self):
+        return True
+
+    def lookups(self, request, model_admin):
+        value = self.value()
+        if value and value.isdigit():
+            case = Case.objects.filter(pk=value).only('title').first()
+            if case:
+                return [(value, str(case))]
+        return []
+
+    def queryset(self, request, queryset):
+        value = self.value()
+        if value:
+            return queryset.filter(case_id=value) if value.isdigit() else queryset.none()
+        return queryset
+
+    def other_params(self):
+        """The changelist's other query parameters, kept as hidden fields in the picker form."""
+        return [(k, v) for k, v in self.request.GET.items() if k not in (self.parameter_name, 'p')]
+
+
+class DifficultyFilter(admin.SimpleListFilter):
+    """Fixed choices instead of a SELECT DISTINCT over every case."""
+    title = 'difficulty'
+    parameter_name = 'difficulty'
+
+    def lookups(self, request, model_admin):
+        return [(d, d.title()) for d in DIFFICULTY_PROFILES]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(difficulty=self.value())
+        return queryset
+
+
+class CategoryFilter(admin.SimpleListFilter):
+    """Fixed choices instead of a SELECT DISTINCT over every clue."""
+    title = 'category'
+    parameter_name = 'category'
+
+    def lookups(self, request, model_admin):
+        return [(c, c.title()) for c in CATEGORIES]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(category=self.value())
+        return queryset
+
+
+class ReadOnlyInline(admin.TabularInline):
+    extra = 0
+    can_delete = False
+    show_change_link = True
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+class SuspectInline(ReadOnlyInline):
+    model = Suspect
+    fields = ['sid', 'name', 'bio']
+
+
+class ClueInline(ReadOnlyInline):
+    model = Clue
+    fields = ['cid', 'category', 'text', 'implicates']
+    readonly_fields = ['implicates']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).prefetch_related('implicates')
+
+    @admin.display(description='implicates')
+    def implicates(self, obj):
+        return ", ".join(i.suspect_sid for i in obj.implicates.all())
+
+
+class RedHerringInline(ReadOnlyInline):
+    model = RedHerring
+    fields = ['rid', 'text']
 
 
 @admin.register(Case)
-class CaseAdmin(admin.ModelAdmin):
+class CaseAdmin(ScalableAdmin):
     list_display = ['title', 'setting', 'difficulty', 'num_suspects', 'num_clues', 'created_at']
-    list_filter = ['difficulty', 'created_at']
-    search_fields = ['title', 'setting']
+    list_filter = [DifficultyFilter, 'created_at']
+    search_fields = ['title', 'setting']  # Trigram-indexed on PostgreSQL
     ordering = ['-created_at']
-    readonly_fields = ['created_at']
+    readonly_fields = ['created_at', 'evidence_matrix']
+    inlines = [SuspectInline, ClueInline, RedHerringInline]
 
 
 @admin.register(Suspect)
-class SuspectAdmin(admin.ModelAdmin):
+class SuspectAdmin(ScalableAdmin):
     list_display = ['sid', 'name', 'case', 'bio']
-    list_filter = ['case']
-    search_fields = ['name', 'sid', 'bio']
+    list_filter = [CaseFilter]
+    search_fields = ['name', '=sid']  # Both indexed on PostgreSQL (0004)
     ordering = ['case', 'sid']
+    autocomplete_fields = ['case']
 
 
 @admin.register(Clue)
-class ClueAdmin(admin.ModelAdmin):
+class ClueAdmin(ScalableAdmin):
     list_display = ['cid', 'category', 'text', 'case']
-    list_filter = ['category', 'case']
-    search_fields = ['cid', 'text']
+    list_filter = [CategoryFilter, CaseFilter]
+    search_fields = ['text', '=cid']  # Both indexed on PostgreSQL (0004)
     ordering = ['case', 'cid']
+    autocomplete_fields = ['case']
 
 
 @admin.register(ClueImplication)
-class ClueImplicationAdmin(admin.ModelAdmin):
+class ClueImplicationAdmin(ScalableAdmin):
     list_display = ['clue', 'suspect_sid', 'case']
-    list_filter = ['case']
-    search_fields = ['suspect_sid']
+    list_filter = [CaseFilter]
+    search_fields = ['=suspect_sid']  # Indexed on PostgreSQL (0004)
     ordering = ['case', 'clue']
+    list_select_related = ['clue', 'case']
+    autocomplete_fields = ['case']
+    raw_id_fields = ['clue']
 
 
 @admin.register(RedHerring)
-class RedHerringAdmin(admin.ModelAdmin):
+class RedHerringAdmin(ScalableAdmin):
     list_display = ['rid', 'text', 'case']
-    list_filter = ['case']
-    search_fields = ['rid', 'text']
+    list_filter = [CaseFilter]
+    search_fields = ['text', '=rid']  # Both indexed on PostgreSQL (0004)
     ordering = ['case', 'rid']
+    autocomplete_fields = ['case']
@@ -0,0 +1,44 @@
+import asyncio
+import time
+from channels.layers import InMemoryChannelLayer
+
+
+class FanoutChannelLayer(InMemoryChannelLayer):
+    """
+    Single-process channel layer tuned for broadcasting to large case rooms.
+
+    The stock in-memory layer deep-copies the message and spawns a task for
+    every member on group_send, and scans every channel for expired messages
+    on each send and receive, which makes a broadcast quadratic in room size.
+    Here the same message dict is enqueued on every member queue directly
+    (consumers must treat group messages as read-only), members whose queue
+    is full are skipped instead of stalling the room, and the expiry scan
+    runs at most once per cleanup_interval seconds.
+    """
+
+    def __init__(self, cleanup_interval=1.0, **kwargs):
+        super().__init__(**kwargs)
+        self.cleanup_interval = cleanup_interval
+        self._last_cleanup = 0.0
+
+    def _clean_expired(self):
+        now = time.monotonic()
+        if now - self._last_cleanup < self.cleanup_interval:
+            return
+        self._last_cleanup = now
+        super()._clean_expired()
+
+    async def group_send(self, group, message):
+        assert isinstance(message, dict), "Message is not a dict"
+        self.require_valid_group_name(group)
+        self._clean_expired()
+
+        expires = time.time() + self.expiry
+        for channel in list(self.groups.get(group, ())):
+            queue = self.channels.setdefault(
+                channel, asyncio.Queue(maxsize=self.get_capacity(channel))
+            )
+            try:
+                queue.put_nowait((expires, message))
+            except asyncio.QueueFull:
+                continue
@@ -0,0 +1,113 @@
+import json
+import time
+from collections import deque
+from urllib.parse import parse_qs
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+
+from .models import Case
+from .utils.check_guess import check_guess
+from .views import GuessThrottle
+
+
+class CaseRoomConsumer(AsyncJsonWebsocketConsumer):
+    """
+    Multiplayer room for a single case. Players connect to
+    ws/cases/<pk>/room/?name=<player> and exchange JSON messages:
+
+        {"type": "note",  "text": "..."}
+        {"type": "vote",  "suspect_id": "S2"}
+        {"type": "guess", "suspect_id": "S2"}
+
+    Every accepted message is broadcast to the whole room. Guesses are
+    limited per connection to the same rate as the REST guess endpoint.
+    """
+
+    async def connect(self):
+        pk = self.scope["url_route"]["kwargs"]["pk"]
+        self.case = await self.get_case(pk)
+        if self.case is None:
+            await self.close()
+            return
+
+        self.suspect_ids = await self.get_suspect_ids()
+        query = parse_qs(self.scope["query_string"].decode())
+        self.player = (query.get("name") or ["anonymous"])[0][:30]
+        self.group_name = f"case_{pk}"
+        throttle = GuessThrottle()
+        self.guess_limit, self.guess_window = throttle.num_requests, throttle.duration
+        self.guess_times = deque()
+
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+        await self.broadcast("join")
+
+    async def disconnect(self, code):
+        if getattr(self, "case", None) is None:
+            return
+        await self.channel_layer.group_discard(self.group_name, self.channel_name)
+        await self.broadcast("leave")
+
+    async def receive(self, text_data=None, bytes_data=None, **kwargs):
+        # A bad frame gets an error reply instead of killing the consumer (which would skip disconnect)
+        if text_data is None:
+            return await self.send_json({"type": "error", "error": "Messages must be JSON text frames"})
+        try:
+            content = await self.decode_json(text_data)
+        except ValueError:
+            return await self.send_json({"type": "error", "error": "Messages must be valid JSON"})
+        await self.receive_json(content, **kwargs)
+
+    async def receive_json(self, content, **kwargs):
+        kind = content.get("type") if isinstance(content, dict) else None
+
+        if kind == "note":
+            text = str(content.get("text", "")).strip()[:240]
+            if not text:
+                return await self.send_json({"type": "error", "error": "text is required"})
+            await self.broadcast("note", text=text)
+
+        elif kind == "vote":
+            suspect_id = content.get("suspect_id")
+            if suspect_id not in self.suspect_ids:
+                return await self.send_json({"type": "error", "error": "Invalid suspect_id for this case"})
+            await self.broadcast("vote", suspect_id=suspect_id)
+
+        elif kind == "guess":
+            if not self.allow_guess():
+                return await self.send_json({"type": "error", "error": "Too many guesses, slow down"})
+            suspect_id = content.get("suspect_id")
+            try:
+                result = await database_sync_to_async(check_guess)(self.case, suspect_id)
+            except ValueError as e:
+                return await self.send_json({"type": "error", "error": str(e)})
+            await self.broadcast("guess", suspect_id=suspect_id, **result)
+
+        else:
+            await self.send_json({"type": "error", "error": "type must be one of: note, vote, guess"})
+
+    def allow_guess(self):
+        """Sliding-window limit of guess_limit guesses per guess_window seconds."""
+        now = time.monotonic()
+        while self.guess_times and self.guess_times[0] <= now - self.guess_window:
+            self.guess_times.popleft()
+        if len(self.guess_times) >= self.guess_limit:
+            return False
+        self.guess_times.append(now)
+        return True
+
+    async def broadcast(self, kind, **payload):
+        """Serialize once and fan the same text frame out to every socket in the room."""
+        text = json.dumps({"type": kind, "player": self.player, **payload})
+        await self.channel_layer.group_send(self.group_name, {"type": "room.message", "text": text})
+
+    async def room_message(self, event):
+        await self.send(text_data=event["text"])
+
+    @database_sync_to_async
+    def get_case(self, pk):
+        return Case.objects.only("id", "culprit_id_hidden").filter(pk=pk).first()
+
+    @database_sync_to_async
+    def get_suspect_ids(self):
+        return set(self.case.suspects.values_list("sid", flat=True))
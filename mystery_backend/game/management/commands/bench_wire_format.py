@@ -0,0 +1,102 @@
+import asyncio
+import json
+import statistics
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from game.utils.compact_mystery import build_compact_prompt, compact_from_mystery, expand_compact
+from game.utils.generate_mystery import build_prompt
+from game.utils.validate_mystery import validate_mystery
+
+
+def token_counter(model):
+    """tiktoken when it is installed and has its encoding available, else ~4 characters per token."""
+    try:
+        import tiktoken
+        encoding = tiktoken.encoding_for_model(model)
+        return lambda text: len(encoding.encode(text))
+    except Exception:
+        return lambda text: max(1, round(len(text) / 4))
+
+
+class Command(BaseCommand):
+    help = "Compare output tokens and latency of the verbose and compact generation formats."
+
+    def add_arguments(self, parser):
+        parser.add_argument("responses", help="NDJSON of recorded verbose responses (e.g. from export_cases)")
+        parser.add_argument("--ms-per-token", type=float, default=12.0,
+                            help="Decode time per output token used to estimate latency")
+        parser.add_argument("--live", type=int, default=0,
+                            help="Also time N real generations per format against the primary model")
+        parser.add_argument("--difficulty", default="medium")
+
+    def handle(self, *args, **options):
+        model = settings.MYSTERY_MODELS[0]
+        count = token_counter(model)
+        verbose_tokens, compact_tokens = [], []
+        skipped = 0
+
+        with open(options["responses"], encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                mystery = json.loads(line)
+                try:
+                    expected = validate_mystery(mystery)
+                except (AssertionError, ValueError):
+                    skipped += 1  # Recorded failures say nothing about the formats
+                    continue
+                compact = compact_from_mystery(mystery)
+                # The compact form must carry exactly the same mystery
+                if validate_mystery(expand_compact(compact)) != expected:
+                    raise CommandError(f"Compact form of {mystery['title']!r} does not round-trip")
+                # Both sides minified and limited to what the model emits (exports add "difficulty")
+                verbose = {k: v for k, v in mystery.items() if k != "difficulty"}
+                verbose_tokens.append(count(json.dumps(verbose, ensure_ascii=False, separators=(",", ":"))))
+                compact_tokens.append(count(json.dumps(compact, ensure_ascii=False, separators=(",", ":"))))
+
+        if not verbose_tokens:
+            raise CommandError("No valid recorded responses found")
+        if skipped:
+            self.stdout.write(f"skipped {skipped} invalid responses")
+
+        ms = options["ms_per_token"]
+        for label, tokens in (("verbose", verbose_tokens), ("compact", compact_tokens)):
+            mean = statistics.mean(tokens)
+            self.stdout.write(
+                f"{label:8} {len(tokens)} responses: mean {mean:.0f} tokens, "
+                f"p50 {statistics.median(tokens):.0f}, max {max(tokens)}, est. decode {mean * ms / 1000:.1f}s"
+            )
+        saved = 1 - sum(compact_tokens) / sum(verbose_tokens)
+        self.stdout.write(f"compact saves {saved:.0%} of output tokens")
+
+        if options["live"]:
+            asyncio.run(self.live(model, options["difficulty"], options["live"]))
+
+    async def live(self, model, difficulty, runs):
+        from openai import AsyncOpenAI
+
+        client = AsyncOpenAI()
+        formats = (("verbose", build_prompt, lambda data: data), ("compact", build_compact_prompt, expand_compact))
+        for label, prompt, parse in formats:
+            system, user = prompt(difficulty)
+            timings, tokens, valid = [], [], 0
+            for _ in range(runs):
+                started = time.perf_counter()
+                response = await client.chat.completions.create(
+                    model=model,
+                    messages=[{"role": "system", "content": system}, {"role": "user", "content": user}],
+                    response_format={"type": "json_object"},
+                )
+                timings.append(time.perf_counter() - started)
+                tokens.append(response.usage.completion_tokens)
+                try:
+                    validate_mystery(parse(json.loads(response.choices[0].message.content)))
+                    valid += 1
+                except (AssertionError, ValueError):
+                    pass
+            self.stdout.write(
+                f"live {label:8} {runs} runs: mean {statistics.mean(tokens):.0f} output tokens, "
+                f"p50 {statistics.median(timings):.1f}s, max {max(timings):.1f}s, {valid}/{runs} valid"
+            )
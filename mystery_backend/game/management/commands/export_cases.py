@@ -0,0 +1,29 @@
+import sys
+import time
+from django.core.management.base import BaseCommand
+
+from game.utils.export_cases import iter_case_lines
+
+
+class Command(BaseCommand):
+    help = "Stream every case as NDJSON (one case per line, MysteryOut shape)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", "-o", default="-", help="File to write to, '-' for stdout")
+        parser.add_argument("--chunk-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        out = sys.stdout if options["output"] == "-" else open(options["output"], "w", encoding="utf-8")
+
+        started = time.perf_counter()
+        count = 0
+        try:
+            for line in iter_case_lines(chunk_size=options["chunk_size"]):
+                out.write(line)
+                count += 1
+        finally:
+            if out is not sys.stdout:
+                out.close()
+
+        elapsed = time.perf_counter() - started
+        self.stderr.write(f"Exported {count} cases in {elapsed:.1f}s ({count / elapsed if elapsed else 0:.0f} cases/s)")
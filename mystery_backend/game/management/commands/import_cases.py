@@ -0,0 +1,32 @@
+import sys
+import time
+from django.core.management.base import BaseCommand
+
+from game.utils.import_cases import import_case_lines
+
+
+class Command(BaseCommand):
+    help = "Import cases from NDJSON written by export_cases, validating every line."
+
+    def add_arguments(self, parser):
+        parser.add_argument("input", help="File to read from, '-' for stdin")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        source = sys.stdin if options["input"] == "-" else open(options["input"], encoding="utf-8")
+
+        def report(line_number, message):
+            self.stderr.write(f"Skipping line {line_number}: {message}")
+
+        started = time.perf_counter()
+        try:
+            imported, skipped = import_case_lines(source, batch_size=options["batch_size"], on_error=report)
+        finally:
+            if source is not sys.stdin:
+                source.close()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"Imported {imported} cases, skipped {skipped} in {elapsed:.1f}s "
+            f"({imported / elapsed if elapsed else 0:.0f} cases/s)"
+        )
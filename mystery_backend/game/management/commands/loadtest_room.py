@@ -0,0 +1,60 @@
+import asyncio
+import time
+from channels.layers import get_channel_layer
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.core.management.base import BaseCommand, CommandError
+
+from game.models import Case
+from game.routing import websocket_urlpatterns
+
+
+class Command(BaseCommand):
+    help = "Open many in-process sockets on one case room and time broadcast fan-out."
+
+    def add_arguments(self, parser):
+        parser.add_argument("case_id", type=int)
+        parser.add_argument("--sockets", type=int, default=1000)
+        parser.add_argument("--messages", type=int, default=10)
+
+    def handle(self, *args, **options):
+        if not Case.objects.filter(pk=options["case_id"]).exists():
+            raise CommandError(f"Case {options['case_id']} does not exist")
+        asyncio.run(self.run(options["case_id"], options["sockets"], options["messages"]))
+
+    async def run(self, case_id, num_sockets, num_messages):
+        app = URLRouter(websocket_urlpatterns)
+        path = f"/ws/cases/{case_id}/room/"
+
+        started = time.perf_counter()
+        sockets = []
+        for i in range(num_sockets):
+            communicator = WebsocketCommunicator(app, f"{path}?name=p{i}")
+            connected, _ = await communicator.connect()
+            if not connected:
+                raise CommandError("Room rejected the connection")
+            sockets.append(communicator)
+        # Drain the join announcements
+        await asyncio.gather(*(self.drain(communicator) for communicator in sockets))
+        self.stdout.write(f"Connected {num_sockets} sockets in {time.perf_counter() - started:.2f}s")
+
+        timings = []
+        for n in range(num_messages):
+            started = time.perf_counter()
+            await sockets[0].send_json_to({"type": "note", "text": f"load test {n}"})
+            await asyncio.gather(*(communicator.receive_from(timeout=30) for communicator in sockets))
+            timings.append(time.perf_counter() - started)
+
+        timings.sort()
+        self.stdout.write(
+            f"Fan-out to {num_sockets} sockets over {num_messages} messages: "
+            f"p50 {timings[len(timings) // 2] * 1000:.1f}ms, max {timings[-1] * 1000:.1f}ms"
+        )
+
+        for communicator in sockets:
+            await communicator.disconnect()
+        await get_channel_layer().flush()
+
+    async def drain(self, communicator):
+        while not await communicator.receive_nothing(timeout=0.1):
+            await communicator.receive_output()
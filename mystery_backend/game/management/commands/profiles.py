@@ -0,0 +1,63 @@
+import json
+from collections import Counter
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+
+from game.utils.profiling import capture_path, list_captures
+
+
+class Command(BaseCommand):
+    help = "List stored request profiles, or summarise one."
+
+    def add_arguments(self, parser):
+        parser.add_argument("name", nargs="?", help="Capture to summarise (omit to list captures)")
+        parser.add_argument("--top", type=int, default=15, help="Frames and queries to show")
+        parser.add_argument("--folded", action="store_true",
+                            help="Print the raw folded stacks (input for flamegraph.pl / speedscope)")
+
+    def handle(self, *args, **options):
+        if not options["name"]:
+            for c in list_captures():
+                captured = datetime.fromtimestamp(c["captured_at"]).strftime("%Y-%m-%d %H:%M:%S")
+                self.stdout.write(f"{c['name']}  {captured}  {c['reason']:7} {c['view']} {c['duration_ms']}ms")
+            return
+
+        path = capture_path(options["name"])
+        if path is None:
+            raise CommandError(f"No capture named {options['name']!r}")
+        data = json.loads(path.read_text(encoding="utf-8"))
+
+        if options["folded"]:
+            for stack, count in {**data["stacks"], **data.get("background_stacks", {})}.items():
+                self.stdout.write(f"{stack} {count}")
+            return
+
+        self.stdout.write(
+            f"{data['method']} {data['path']} -> {data['status']} ({data['view']}, {data['reason']}): "
+            f"{data['duration_ms']}ms, {data['samples']} samples every {data['interval_ms']:g}ms, "
+            f"{len(data['sql'])} queries"
+        )
+
+        if data.get("generation"):
+            self.stdout.write("\ngeneration:")
+            for attempt in data["generation"]:
+                self.stdout.write(f"  {attempt['backend']:20} {attempt['outcome']:9} "
+                                  f"started +{attempt['started_ms']}ms, took {attempt['ms']}ms")
+
+        self.write_hottest("hottest frames", data["stacks"], data["samples"], options["top"])
+        if data.get("background_samples"):
+            self.write_hottest("hottest frames on shared threads while generating",
+                               data["background_stacks"], data["background_samples"], options["top"])
+
+        self.stdout.write(f"\nslowest queries ({sum(q['ms'] for q in data['sql']):.1f}ms total):")
+        for query in sorted(data["sql"], key=lambda q: q["ms"], reverse=True)[:options["top"]]:
+            self.stdout.write(f"  {query['ms']:8.2f}ms  {query['sql'][:160]}")
+
+    def write_hottest(self, title, stacks, samples, top):
+        # Self time: samples whose innermost frame is this one
+        leaves = Counter()
+        for stack, count in stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        self.stdout.write(f"\n{title}:")
+        for frame, count in leaves.most_common(top):
+            self.stdout.write(f"  {count / max(samples, 1):6.1%}  {frame}")
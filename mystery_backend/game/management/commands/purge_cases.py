@@ -0,0 +1,65 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError
+
+from game.utils.retention import stale_cases, purge_batch
+
+
+class Command(BaseCommand):
+    help = "Delete or archive stale cases in small batches so live traffic is never blocked for long."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--unviewed-days", type=int, help="Purge cases not viewed in the last N days")
+        parser.add_argument("--older-than-days", type=int, help="Purge cases created more than N days ago")
+        parser.add_argument("--archive", action="store_true", help="Move cases to the compressed archive table instead of dropping them")
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument("--pause", type=float, default=0.05, help="Seconds to sleep between batches")
+        parser.add_argument("--max-cases", type=int, help="Stop after purging this many cases")
+        parser.add_argument("--dry-run", action="store_true", help="Only count matching cases")
+
+    def handle(self, *args, **options):
+        if options["unviewed_days"] is None and options["older_than_days"] is None:
+            raise CommandError("Pass --unviewed-days and/or --older-than-days")
+
+        stale = stale_cases(options["unviewed_days"], options["older_than_days"])
+        if options["dry_run"]:
+            self.stdout.write(f"{stale.count()} cases match the retention policy")
+            return
+
+        batch_size, max_cases = options["batch_size"], options["max_cases"]
+        cases = rows = batches = timeouts = 0
+        delete_total = delete_max = 0.0
+        started = time.perf_counter()
+
+        while max_cases is None or cases < max_cases:
+            size = batch_size if max_cases is None else min(batch_size, max_cases - cases)
+            try:
+                purged, deleted, delete_time = purge_batch(stale, size, archive=options["archive"])
+            except OperationalError:
+                # Lock timeout - back off and let live traffic through
+                timeouts += 1
+                if timeouts > 10:
+                    raise CommandError("Giving up after repeated lock timeouts")
+                time.sleep(options["pause"] * 10)
+                continue
+            if not purged:
+                break
+
+            cases += purged
+            rows += deleted
+            batches += 1
+            delete_total += delete_time
+            delete_max = max(delete_max, delete_time)
+            if batches % 50 == 0:
+                self.stderr.write(f"... {cases} cases, {rows} rows")
+            time.sleep(options["pause"])
+
+        elapsed = time.perf_counter() - started
+        action = "Archived" if options["archive"] else "Deleted"
+        self.stdout.write(
+            f"{action} {cases} cases ({rows} rows) in {batches} batches over {elapsed:.1f}s: "
+            f"{rows / elapsed if elapsed else 0:.0f} rows/s, "
+            # DELETE time includes waiting for row locks held by live traffic
+            f"delete {delete_total * 1000:.0f}ms total / {delete_max * 1000:.1f}ms slowest batch, "
+            f"{timeouts} lock timeouts"
+        )
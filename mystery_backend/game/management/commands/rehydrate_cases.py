@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from game.utils.retention import rehydrate_case
+
+
+class Command(BaseCommand):
+    help = "Restore archived cases under their original ids."
+
+    def add_arguments(self, parser):
+        parser.add_argument("case_ids", nargs="+", type=int)
+
+    def handle(self, *args, **options):
+        for pk in options["case_ids"]:
+            if rehydrate_case(pk):
+                self.stdout.write(f"Restored case {pk}")
+            else:
+                self.stderr.write(f"No archive for case {pk}")
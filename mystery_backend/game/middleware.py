@@ -0,0 +1,35 @@
+import random
+from django.conf import settings
+
+
+class ProfilingMiddleware:
+    """
+    Profiles requests to the views listed in PROFILE_VIEWS.
+
+    A PROFILE_SAMPLE_RATE fraction of requests is always captured. With
+    PROFILE_SLOW_MS set, every request to those views is profiled and kept
+    only if it ran over the threshold. Only installed when one of the two is
+    enabled, so it costs nothing otherwise.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        capture = getattr(request, '_profile_capture', None)
+        if capture is not None:
+            request._profile_capture = None
+            capture.finish(request, response)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'view_class', None)
+        if view_class is None or view_class.__name__ not in settings.PROFILE_VIEWS:
+            return None
+
+        sampled = random.random() < settings.PROFILE_SAMPLE_RATE
+        if sampled or settings.PROFILE_SLOW_MS > 0:
+            from .utils.profiling import Capture
+            request._profile_capture = Capture(view_class.__name__, sampled)
+        return None
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.1 on 2026-10-19 13:03
+
+from itertools import groupby
+from operator import itemgetter
+
+from django.db import migrations, models
+
+CATEGORIES = ["timeline", "forensic", "behavioral", "financial"]
+BATCH_SIZE = 500
+
+
+def backfill_evidence_matrix(apps, schema_editor):
+    Case = apps.get_model('game', 'Case')
+    Suspect = apps.get_model('game', 'Suspect')
+    ClueImplication = apps.get_model('game', 'ClueImplication')
+
+    # Two ordered streams merged on case_id; suspects keep insertion (mystery) order
+    # to match build_evidence_matrix
+    suspects = groupby(
+        Suspect.objects.order_by('case_id', 'id').values_list('case_id', 'sid').iterator(chunk_size=2000),
+        key=itemgetter(0),
+    )
+    implications = groupby(
+        ClueImplication.objects.order_by('case_id').values_list('case_id', 'suspect_sid', 'clue__category')
+        .iterator(chunk_size=2000),
+        key=itemgetter(0),
+    )
+
+    pending = next(implications, None)
+    batch = []
+    for case_id, rows in suspects:
+        sids = [sid for _, sid in rows]
+        counts = {sid: [0] * len(CATEGORIES) for sid in sids}
+        while pending is not None and pending[0] < case_id:
+            pending = next(implications, None)
+        if pending is not None and pending[0] == case_id:
+            for _, sid, category in pending[1]:
+                if sid in counts and category in CATEGORIES:
+                    counts[sid][CATEGORIES.index(category)] += 1
+            pending = next(implications, None)
+
+        batch.append(Case(pk=case_id, evidence_matrix={
+            "suspects": sids, "categories": CATEGORIES, "counts": [counts[sid] for sid in sids],
+        }))
+        if len(batch) >= BATCH_SIZE:
+            Case.objects.bulk_update(batch, ['evidence_matrix'])
+            batch = []
+    if batch:
+        Case.objects.bulk_update(batch, ['evidence_matrix'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='case',
+            name='evidence_matrix',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.RunPython(backfill_evidence_matrix, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.1 on 2026-10-19 13:29
+
+from django.db import migrations, models
+
+# Built CONCURRENTLY on PostgreSQL so writes to the large child tables are not
+# blocked while the indexes build. Other databases use a plain CREATE INDEX.
+ADMIN_INDEXES = [
+    ('case', models.Index(fields=['created_at'], name='game_case_created_432b0c_idx')),
+    ('clue', models.Index(fields=['case', 'cid'], name='game_clue_case_id_492f2a_idx')),
+    ('clueimplication', models.Index(fields=['case', 'clue'], name='game_clueim_case_id_2bb951_idx')),
+    ('redherring', models.Index(fields=['case', 'rid'], name='game_redher_case_id_45f530_idx')),
+    ('suspect', models.Index(fields=['case', 'sid'], name='game_suspec_case_id_2af6d4_idx')),
+]
+
+
+def create_admin_indexes(apps, schema_editor):
+    concurrently = schema_editor.connection.vendor == 'postgresql'
+    for model_name, index in ADMIN_INDEXES:
+        model = apps.get_model('game', model_name)
+        if concurrently:
+            schema_editor.add_index(model, index, concurrently=True)
+        else:
+            schema_editor.add_index(model, index)
+
+
+def drop_admin_indexes(apps, schema_editor):
+    concurrently = schema_editor.connection.vendor == 'postgresql'
+    for model_name, index in ADMIN_INDEXES:
+        model = apps.get_model('game', model_name)
+        if concurrently:
+            schema_editor.remove_index(model, index, concurrently=True)
+        else:
+            schema_editor.remove_index(model, index)
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('game', '0002_case_evidence_matrix'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(create_admin_indexes, drop_admin_indexes),
+            ],
+            state_operations=[
+                migrations.AddIndex(model_name=model_name, index=index) for model_name, index in ADMIN_INDEXES
+            ],
+        ),
+    ]
@@ -0,0 +1,58 @@
+from django.db import migrations
+
+# Indexes backing the admin's search on PostgreSQL. Django renders icontains
+# as UPPER("col"::text) LIKE UPPER(...) and "=" (iexact) searches as
+# UPPER("col"::text) = UPPER(...), so the indexes are built on that same
+# expression: trigram GIN for text, btree for the exact id searches. Every
+# branch of a search's OR is then indexed and the planner can BitmapOr them.
+# Other databases skip this.
+TRIGRAM_INDEXES = [
+    ('game_case_title_trgm', 'game_case', 'title'),
+    ('game_case_setting_trgm', 'game_case', 'setting'),
+    ('game_suspect_name_trgm', 'game_suspect', 'name'),
+    ('game_clue_text_trgm', 'game_clue', 'text'),
+    ('game_redherring_text_trgm', 'game_redherring', 'text'),
+]
+
+EXACT_INDEXES = [
+    ('game_suspect_sid_upper', 'game_suspect', 'sid'),
+    ('game_clue_cid_upper', 'game_clue', 'cid'),
+    ('game_redherring_rid_upper', 'game_redherring', 'rid'),
+    ('game_clueimplication_sid_upper', 'game_clueimplication', 'suspect_sid'),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{name}" '
+            f'ON "{table}" USING gin ((UPPER("{column}"::text)) gin_trgm_ops)'
+        )
+    for name, table, column in EXACT_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{name}" ON "{table}" ((UPPER("{column}"::text)))'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _, _ in TRIGRAM_INDEXES + EXACT_INDEXES:
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('game', '0003_admin_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.1 on 2026-10-19 13:31
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_last_viewed_at(apps, schema_editor):
+    # Existing cases have no view history. Count them as viewed at deploy time, so
+    # `purge_cases --unviewed-days N` only picks them up once N days pass without a view.
+    Case = apps.get_model('game', 'Case')
+    Case.objects.filter(last_viewed_at__isnull=True).update(last_viewed_at=timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0004_search_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedCase',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=120)),
+                ('difficulty', models.CharField(max_length=10)),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('payload', models.BinaryField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='case',
+            name='last_viewed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_last_viewed_at, migrations.RunPython.noop),
+    ]
@@ -8,7 +8,15 @@ class Case(models.Model):
     num_suspects = models.PositiveSmallIntegerField(default=5)
     num_clues = models.PositiveSmallIntegerField(default=8)
     num_red_herrings = models.PositiveSmallIntegerField(default=2)
+    evidence_matrix = models.JSONField(default=dict, blank=True)  # suspect x category clue counts
     created_at = models.DateTimeField(auto_now_add=True)
+    last_viewed_at = models.DateTimeField(null=True, blank=True)  # Refreshed at most daily
+
+    class Meta:
+        indexes = [models.Index(fields=["created_at"])]
+
+    def __str__(self):
+        return self.title
 
 class Suspect(models.Model):
     case = models.ForeignKey(Case, on_delete=models.CASCADE, related_name="suspects")
@@ -16,18 +24,39 @@ class Suspect(models.Model):
     name = models.CharField(max_length=60)
     bio = models.CharField(max_length=220)
 
+    class Meta:
+        indexes = [models.Index(fields=["case", "sid"])]
+
 class Clue(models.Model):
     case = models.ForeignKey(Case, on_delete=models.CASCADE, related_name="clues")
     cid = models.CharField(max_length=10)      # "C1"
     category = models.CharField(max_length=20) # timeline|forensic|behavioral|financial
     text = models.CharField(max_length=240)
 
+    class Meta:
+        indexes = [models.Index(fields=["case", "cid"])]
+
 class ClueImplication(models.Model):
     case = models.ForeignKey(Case, on_delete=models.CASCADE, related_name="implications")
     clue = models.ForeignKey(Clue, on_delete=models.CASCADE, related_name="implicates")
     suspect_sid = models.CharField(max_length=10)  # "S1"
 
+    class Meta:
+        indexes = [models.Index(fields=["case", "clue"])]
+
 class RedHerring(models.Model):
     case = models.ForeignKey(Case, on_delete=models.CASCADE, related_name="red_herrings")
     rid = models.CharField(max_length=10)  # "R1"
     text = models.CharField(max_length=200)
+
+    class Meta:
+        indexes = [models.Index(fields=["case", "rid"])]
+
+class ArchivedCase(models.Model):
+    """Cold storage for purged cases - the whole case as compressed JSON under its original id."""
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=120)
+    difficulty = models.CharField(max_length=10)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    payload = models.BinaryField()  # zlib-compressed MysteryOut JSON
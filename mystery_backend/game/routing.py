@@ -0,0 +1,6 @@
+from django.urls import path
+from .consumers import CaseRoomConsumer
+
+websocket_urlpatterns = [
+    path("ws/cases/<int:pk>/room/", CaseRoomConsumer.as_asgi()),
+]
@@ -1,3 +1,247 @@
-from django.test import TestCase
+import asyncio
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+
+from .models import Case
+from .utils.admission import AdmissionController, AdmissionRejected
+from .utils.generation_router import Backend, GenerationRouter
+from .utils.import_cases import insert_mysteries
+from .utils.validate_mystery import validate_mystery
+
+
+def make_mystery(n=0):
+    return {
+        "title": f"Case {n}",
+        "setting": "Manor",
+        "suspects": [
+            {"id": "S1", "name": "Ada", "bio": "Cook"},
+            {"id": "S2", "name": "Bo", "bio": "Butler"},
+            {"id": "S3", "name": "Cy", "bio": "Heir"},
+        ],
+        "culprit_id": "S1",
+        "clues": [
+            {"id": "C1", "category": "timeline", "text": "Seen late", "implicates": ["S1"]},
+            {"id": "C2", "category": "forensic", "text": "Prints", "implicates": ["S1", "S2"]},
+            {"id": "C3", "category": "financial", "text": "Debts", "implicates": ["S1", "S3"]},
+        ],
+        "red_herrings": [{"id": "R1", "text": "A broken vase"}],
+        "why_unique": "",
+    }
+
+
+class AdminQueryCountTests(TestCase):
+    """Admin pages must run a fixed number of queries however many rows are shown."""
+
+    @classmethod
+    def setUpTestData(cls):
+        insert_mysteries([(validate_mystery(make_mystery(n)), "easy") for n in range(5)])
+        cls.case = Case.objects.order_by("pk").first()
+        cls.admin = User.objects.create_superuser("admin", "admin@example.com", "pw")
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def assertPageQueries(self, num, url):
+        with self.assertNumQueries(num):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_case_changelist(self):
+        self.assertPageQueries(4, "/admin/game/case/")
+        self.assertPageQueries(4, "/admin/game/case/?difficulty=easy")
+        self.assertPageQueries(4, "/admin/game/case/?q=Manor")
+
+    def test_case_change_page_with_inlines(self):
+        self.assertPageQueries(8, f"/admin/game/case/{self.case.pk}/change/")
+
+    def test_child_changelists(self):
+        for model in ("suspect", "clue", "clueimplication", "redherring"):
+            with self.subTest(model=model):
+                self.assertPageQueries(4, f"/admin/game/{model}/")
+
+    def test_child_changelists_filtered_by_case(self):
+        for model in ("suspect", "clue", "clueimplication", "redherring"):
+            with self.subTest(model=model):
+                response = self.assertPageQueries(5, f"/admin/game/{model}/?case={self.case.pk}")
+                self.assertContains(response, 'id="lookup_id_case"')
+
+    def test_clue_changelist_filtered_by_category(self):
+        self.assertPageQueries(4, "/admin/game/clue/?category=forensic")
+
+    def test_case_picker_keeps_other_filters_and_lookup_popup_loads(self):
+        response = self.client.get(f"/admin/game/clue/?category=forensic&case={self.case.pk}")
+        self.assertContains(response, '<input type="hidden" name="category" value="forensic">', html=True)
+        popup = self.client.get("/admin/game/case/?_to_field=id&_popup=1")
+        self.assertEqual(popup.status_code, 200)
+
+
+def fake_backend(name, delay=0.0, answer=None, error=None, log=None):
+    """A backend that answers (or raises) after a scripted delay, logging calls and cancellations."""
+    log = [] if log is None else log
+
+    async def call(system, user):
+        log.append(f"{name} called")
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            log.append(f"{name} cancelled")
+            raise
+        if error is not None:
+            raise error
+        return answer if answer is not None else make_mystery(name)
+
+    return Backend(name, call)
+
+
+class GenerationRouterTests(SimpleTestCase):
+
+    def run_router(self, router):
+        started = time.perf_counter()
+        result = asyncio.run(router.agenerate("system", "user"))
+        return result, time.perf_counter() - started
+
+    def test_fast_primary_answers_without_hedging(self):
+        log = []
+        router = GenerationRouter([fake_backend("primary", 0.01, log=log), fake_backend("hedge", log=log)],
+                                  default_delay=0.5)
+        result, _ = self.run_router(router)
+        self.assertEqual(result["title"], "Case primary")
+        self.assertEqual(log, ["primary called"])
+
+    def test_hedge_fires_after_delay_and_cancels_loser(self):
+        log = []
+        router = GenerationRouter([fake_backend("primary", 5, log=log), fake_backend("hedge", 0.01, log=log)],
+                                  default_delay=0.05)
+        result, elapsed = self.run_router(router)
+        self.assertEqual(result["title"], "Case hedge")
+        self.assertLess(elapsed, 1)
+        self.assertEqual(log, ["primary called", "hedge called", "primary cancelled"])
+        # The cancelled primary still records how long it was kept waiting
+        self.assertGreaterEqual(router.backends[0].latencies[-1], 0.05)
+
+    def test_trace_records_each_backend_asked(self):
+        router = GenerationRouter([fake_backend("primary", 5), fake_backend("hedge", 0.01)], default_delay=0.05)
+        trace = []
+        asyncio.run(router.agenerate("system", "user", trace))
+        self.assertEqual([(t["backend"], t["outcome"]) for t in trace], [("hedge", "ok"), ("primary", "cancelled")])
+        self.assertGreaterEqual(trace[0]["started_ms"], 50)
+
+    def test_error_fails_over_immediately(self):
+        router = GenerationRouter([fake_backend("primary", error=RuntimeError("boom")), fake_backend("hedge")],
+                                  default_delay=5)
+        result, elapsed = self.run_router(router)
+        self.assertEqual(result["title"], "Case hedge")
+        self.assertLess(elapsed, 1)
+
+    def test_invalid_answer_fails_over_immediately(self):
+        invalid = dict(make_mystery("primary"), culprit_id="S9")
+        router = GenerationRouter([fake_backend("primary", answer=invalid), fake_backend("hedge")], default_delay=5)
+        result, elapsed = self.run_router(router)
+        self.assertEqual(result["title"], "Case hedge")
+        self.assertLess(elapsed, 1)
+
+    def test_hedge_delay_adapts_after_min_samples(self):
+        router = GenerationRouter([fake_backend("primary", 0.02), fake_backend("hedge")],
+                                  hedge_percentile=0.9, default_delay=5, min_samples=3)
+        for _ in range(2):
+            self.run_router(router)
+        self.assertEqual(router.hedge_delay(), 5)
+        self.run_router(router)
+        self.assertLess(router.hedge_delay(), 1)
+        self.assertGreaterEqual(router.hedge_delay(), 0.02)
+
+    def test_total_failure_raises_last_error(self):
+        router = GenerationRouter([fake_backend("primary", error=RuntimeError("first")),
+                                   fake_backend("hedge", error=RuntimeError("second"))])
+        with self.assertRaisesMessage(RuntimeError, "second"):
+            self.run_router(router)
+
+    def test_total_failure_returns_invalid_answer_for_the_caller_to_report(self):
+        invalid = dict(make_mystery("hedge"), culprit_id="S9")
+        router = GenerationRouter([fake_backend("primary", error=RuntimeError("boom")),
+                                   fake_backend("hedge", answer=invalid)])
+        result, _ = self.run_router(router)
+        self.assertEqual(result, invalid)
+
+    def test_hedge_that_cannot_be_admitted_does_not_fire(self):
+        log, asked = [], []
+        router = GenerationRouter([fake_backend("primary", 0.2, log=log), fake_backend("hedge", log=log)],
+                                  default_delay=0.05)
+        result = asyncio.run(router.agenerate("system", "user", admit_extra=lambda slot: asked.append(slot)))
+        self.assertEqual(result["title"], "Case primary")
+        self.assertEqual(log, ["primary called"])
+        self.assertEqual(asked, [True])  # Overlaps the primary, so it needed its own slot
+
+    def test_failover_reuses_the_callers_slot_but_is_still_admitted(self):
+        asked, released = [], []
+
+        def admit_extra(slot):
+            asked.append(slot)
+            return lambda: released.append(slot)
+
+        router = GenerationRouter([fake_backend("primary", error=RuntimeError("boom")), fake_backend("hedge")],
+                                  default_delay=5)
+        result = asyncio.run(router.agenerate("system", "user", admit_extra=admit_extra))
+        self.assertEqual(result["title"], "Case hedge")
+        self.assertEqual(asked, [False])
+        self.assertEqual(released, [False])
+
+    def test_generate_runs_on_background_loop(self):
+        router = GenerationRouter([fake_backend("primary")])
+        self.assertEqual(router.generate("system", "user")["title"], "Case primary")
+
+
+class CaseCreateTests(TestCase):
+
+    def test_generation_timeout_returns_504_with_retry_after(self):
+        with mock.patch("game.views.generate_mystery_plot", side_effect=TimeoutError):
+            response = self.client.post("/api/cases/", {"difficulty": "easy"}, content_type="application/json")
+        self.assertEqual(response.status_code, 504)
+        self.assertIn("Retry-After", response)
+
+    def test_admission_rejection_returns_503_with_retry_after(self):
+        rejected = AdmissionRejected("concurrency limit reached", 7)
+        with mock.patch("game.views.generate_mystery_plot", side_effect=rejected):
+            response = self.client.post("/api/cases/", {"difficulty": "easy"}, content_type="application/json")
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "7")
+
+
+class AdmissionControllerTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_overrunning_generation_does_not_free_a_slot_it_no_longer_owns(self):
+        controller = AdmissionController(max_concurrency=1, tokens_per_minute=10**9, max_queue=0,
+                                         queue_timeout=0.1, slot_ttl=1)
+        first = controller.admit(10)
+        first.__enter__()
+        time.sleep(1.1)  # Overruns slot_ttl, so its slot expires
+
+        with controller.admit(10):
+            first.__exit__(None, None, None)
+            with self.assertRaises(AdmissionRejected):
+                with controller.admit(10):
+                    pass
+
+        with controller.admit(10):
+            pass
+
+    def test_extra_calls_take_their_own_slot_and_tokens(self):
+        controller = AdmissionController(max_concurrency=2, tokens_per_minute=250, max_queue=0,
+                                         queue_timeout=0.1, slot_ttl=60, reserved_for_users=0)
+        with controller.admit(100):
+            release = controller.try_admit(100)
+            self.assertIsNotNone(release)
+            self.assertEqual(controller.stats()['in_flight'], 2)
+            self.assertEqual(controller.stats()['tokens_this_minute'], 200)
+            self.assertIsNone(controller.try_admit(10))  # No slot left
+            release()
+            self.assertIsNone(controller.try_admit(100, slot=False))  # Over the token budget
+            self.assertEqual(controller.stats()['extra_calls_skipped_total'], 2)
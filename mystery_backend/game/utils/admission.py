@@ -0,0 +1,187 @@
+import random
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Dict, Any, Optional, Tuple
+from django.conf import settings
+from django.core.cache import cache
+
+# Rough output size per generated item (suspect, clue or red herring), in tokens
+TOKENS_PER_ITEM = 60
+
+
+class AdmissionRejected(Exception):
+    """Raised when outbound LLM capacity is saturated. Callers should answer 503 with Retry-After."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def estimate_tokens(system: str, user: str, profile: Dict[str, int]) -> int:
+    """Prompt tokens (~4 chars each) plus expected output for the difficulty profile."""
+    items = profile['num_suspects'] + profile['num_clues'] + profile['num_red_herrings']
+    return (len(system) + len(user)) // 4 + items * TOKENS_PER_ITEM + 100
+
+
+class AdmissionController:
+    """
+    Shared admission control for outbound LLM calls.
+
+    - Concurrency: at most max_concurrency OpenAI calls in flight. Each one
+      holds a slot key with a TTL, so a crashed worker cannot leak capacity.
+    - Token budget: estimated tokens are charged to a per-minute window
+      capped at tokens_per_minute.
+    - Queueing: "user" requests wait up to queue_timeout seconds for
+      capacity, with at most max_queue waiting. "background" requests never
+      queue, leave reserved_for_users slots free and back off while any user
+      is waiting.
+    - Extra calls: a generation that fires more than one call (hedges and
+      failovers) admits each extra call through try_admit, with background
+      rules. A call that can't be admitted is simply not made.
+
+    State lives in the Django cache, so it is shared across workers when
+    CACHES points at Redis or Memcached (per-process with the default
+    local-memory cache).
+    """
+
+    PREFIX = 'llm_admission'
+
+    def __init__(self, max_concurrency: int, tokens_per_minute: int, max_queue: int,
+                 queue_timeout: float, slot_ttl: int, reserved_for_users: int = 1, retry_after: int = 5):
+        self.max_concurrency = max_concurrency
+        self.tokens_per_minute = tokens_per_minute
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.slot_ttl = slot_ttl
+        self.reserved_for_users = reserved_for_users
+        self.retry_after = retry_after
+
+    @classmethod
+    def from_settings(cls) -> 'AdmissionController':
+        return cls(
+            max_concurrency=settings.LLM_MAX_CONCURRENCY,
+            tokens_per_minute=settings.LLM_TOKENS_PER_MINUTE,
+            max_queue=settings.LLM_MAX_QUEUE,
+            queue_timeout=settings.LLM_QUEUE_TIMEOUT,
+            slot_ttl=settings.LLM_SLOT_TTL,
+        )
+
+    def _key(self, *parts) -> str:
+        return ':'.join((self.PREFIX,) + tuple(str(p) for p in parts))
+
+    def _incr(self, key: str, delta: int = 1, timeout: Optional[int] = None) -> int:
+        cache.add(key, 0, timeout)
+        try:
+            return cache.incr(key, delta)
+        except ValueError:  # Expired between add and incr
+            cache.add(key, delta, timeout)
+            return delta
+
+    def _window(self) -> int:
+        return int(time.time() // 60)
+
+    @contextmanager
+    def admit(self, estimated_tokens: int, priority: str = 'user'):
+        """Hold a slot and token budget for one generation, or raise AdmissionRejected."""
+        slot, token = self._acquire(estimated_tokens, priority)
+        self._incr(self._key('admitted'))
+        try:
+            yield
+        finally:
+            self._release(slot, token)
+
+    def try_admit(self, estimated_tokens: int, slot: bool = True) -> Optional[Callable[[], None]]:
+        """
+        Admit one extra call inside an admitted generation without queueing. Its tokens are
+        always charged. With slot=False it runs in a slot the generation already holds.
+        Returns a release callable, or None if there is no capacity.
+        """
+        if not slot:
+            if not self._charge(estimated_tokens):
+                self._incr(self._key('extra_skipped'))
+                return None
+            return lambda: None
+
+        acquired = self._try_acquire(estimated_tokens, 'background')
+        if isinstance(acquired, AdmissionRejected):
+            self._incr(self._key('extra_skipped'))
+            return None
+        self._incr(self._key('admitted'))
+        return lambda: self._release(*acquired)
+
+    def _release(self, slot: str, token: str) -> None:
+        # Only free the slot if it is still ours: after slot_ttl it may have expired and been taken
+        if cache.get(slot) == token:
+            cache.delete(slot)
+
+    def _charge(self, tokens: int) -> bool:
+        """Charge tokens to this minute's budget; False (and nothing charged) if it would overflow."""
+        window_key = self._key('tokens', self._window())
+        if self._incr(window_key, tokens, timeout=120) > self.tokens_per_minute:
+            self._incr(window_key, -tokens, timeout=120)
+            return False
+        return True
+
+    def _acquire(self, tokens: int, priority: str) -> Tuple[str, str]:
+        reason = self._try_acquire(tokens, priority)
+        if not isinstance(reason, AdmissionRejected):
+            return reason
+        if priority != 'user':
+            self._reject(reason)
+
+        if self._incr(self._key('waiting')) > self.max_queue:
+            self._incr(self._key('waiting'), -1)
+            self._reject(AdmissionRejected(f'{reason.reason}, queue full', reason.retry_after))
+        try:
+            deadline = time.monotonic() + self.queue_timeout
+            while time.monotonic() < deadline:
+                time.sleep(random.uniform(0.05, 0.25))
+                reason = self._try_acquire(tokens, priority)
+                if not isinstance(reason, AdmissionRejected):
+                    return reason
+            self._reject(reason)
+        finally:
+            self._incr(self._key('waiting'), -1)
+
+    def _try_acquire(self, tokens: int, priority: str):
+        """Returns the held (slot key, owner token), or an AdmissionRejected describing why not."""
+        slots = self.max_concurrency
+        if priority != 'user':
+            if (cache.get(self._key('waiting')) or 0) > 0:
+                return AdmissionRejected('users waiting', self.retry_after)
+            slots = max(self.max_concurrency - self.reserved_for_users, 0)
+
+        if not self._charge(tokens):
+            return AdmissionRejected('token budget exhausted', 60 - int(time.time() % 60))
+
+        token = uuid.uuid4().hex
+        for i in range(slots):
+            key = self._key('slot', i)
+            if cache.add(key, token, self.slot_ttl):
+                return key, token
+
+        self._incr(self._key('tokens', self._window()), -tokens, timeout=120)
+        return AdmissionRejected('concurrency limit reached', self.retry_after)
+
+    def _reject(self, rejection: AdmissionRejected):
+        self._incr(self._key('rejected'))
+        raise rejection
+
+    def stats(self) -> Dict[str, Any]:
+        in_flight = sum(1 for i in range(self.max_concurrency) if cache.get(self._key('slot', i)) is not None)
+        return {
+            'in_flight': in_flight,
+            'max_concurrency': self.max_concurrency,
+            'waiting': max(cache.get(self._key('waiting')) or 0, 0),
+            'max_queue': self.max_queue,
+            'tokens_this_minute': max(cache.get(self._key('tokens', self._window())) or 0, 0),
+            'tokens_per_minute': self.tokens_per_minute,
+            'admitted_total': cache.get(self._key('admitted')) or 0,
+            'rejected_total': cache.get(self._key('rejected')) or 0,
+            'extra_calls_skipped_total': cache.get(self._key('extra_skipped')) or 0,
+        }
+
+
+admission = AdmissionController.from_settings()
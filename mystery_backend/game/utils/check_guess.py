@@ -0,0 +1,22 @@
+from typing import Dict, Any
+from ..models import Case, Suspect
+
+def check_guess(case: Case, suspect_id: str) -> Dict[str, Any]:
+    """Compare a guess with the hidden culprit. Raises ValueError for invalid guesses."""
+
+    # Validate suspect_id is provided
+    if not suspect_id:
+        raise ValueError("suspect_id is required")
+
+    # Validate suspect_id exists in this case
+    if not Suspect.objects.filter(case=case, sid=suspect_id).exists():
+        raise ValueError("Invalid suspect_id for this case")
+
+    # Compare guess with hidden culprit identity
+    is_correct = suspect_id == case.culprit_id_hidden
+
+    # Return result with personalized feedback
+    return {
+        "correct": is_correct,
+        "message": f"Congratulations! You solved the mystery. {suspect_id} was indeed the culprit!" if is_correct else f"Incorrect! {suspect_id} is not the culprit. Keep investigating!"
+    }
@@ -0,0 +1,69 @@
+# Compact wire format for LLM output: short keys, positional arrays and
+# server-assigned ids, expanded into the MysteryOut shape before validation.
+#
+#   {"t": title, "s": setting,
+#    "p": [[name, bio], ...],            suspects, become S1..Sn
+#    "k": 2,                             culprit, 1-based index into "p"
+#    "c": [[cat, text, [1, 3]], ...],    clues, become C1..Cn; cat is t|f|b|m
+#    "r": [text, ...],                   red herrings, become R1..Rn
+#    "w": why_unique}
+from typing import Dict, Any, Tuple
+from ..config import get_difficulty_profile
+
+CATEGORY_CODES = {"t": "timeline", "f": "forensic", "b": "behavioral", "m": "financial"}
+CATEGORY_LETTERS = {name: code for code, name in CATEGORY_CODES.items()}
+
+
+def build_compact_prompt(difficulty: str) -> Tuple[str, str]:
+    diff, profile = get_difficulty_profile(difficulty)
+
+    num_suspects = profile['num_suspects']
+    num_clues = profile['num_clues']
+    num_red_herrings = profile['num_red_herrings']
+
+    system = 'You produce murder mysteries as strict, minified JSON.'
+    user = f"""Difficulty: {diff}. EXACTLY {num_suspects} suspects, {num_clues} clues, {num_red_herrings} red herrings.
+Schema: {{"t":title,"s":setting,"p":[[name,bio]],"k":culprit,"c":[[cat,text,[suspects]]],"r":[red_herring_text],"w":why_unique}}
+- Suspects are referred to by 1-based position in "p"; "k" is the culprit's position.
+- cat is one of "t" timeline, "f" forensic, "b" behavioral, "m" financial.
+- Each clue implicates 1-2 suspects. At least 2 clues implicate the culprit, every other suspect is implicated at least once, and the culprit is implicated strictly more than anyone else.
+- Bios and clue text ≤200 chars. PG-13, no real people, no gore."""
+
+    return system, user
+
+
+def expand_compact(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Expand a compact response into the MysteryOut shape. Raises ValueError if it is malformed."""
+    try:
+        suspects = [{"id": f"S{i}", "name": name, "bio": bio} for i, (name, bio) in enumerate(data["p"], start=1)]
+        clues = [
+            {"id": f"C{i}", "category": CATEGORY_CODES.get(cat, cat), "text": text,
+             "implicates": [f"S{n}" for n in implicates]}
+            for i, (cat, text, implicates) in enumerate(data["c"], start=1)
+        ]
+        return {
+            "title": data["t"],
+            "setting": data["s"],
+            "suspects": suspects,
+            "culprit_id": f"S{data['k']}",
+            "clues": clues,
+            "red_herrings": [{"id": f"R{i}", "text": text} for i, text in enumerate(data["r"], start=1)],
+            "why_unique": data.get("w", ""),
+        }
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Malformed compact mystery: {e!r}") from e
+
+
+def compact_from_mystery(mystery: Dict[str, Any]) -> Dict[str, Any]:
+    """The compact equivalent of a MysteryOut-shaped mystery (used to benchmark recorded responses)."""
+    position = {s["id"]: i for i, s in enumerate(mystery["suspects"], start=1)}
+    return {
+        "t": mystery["title"],
+        "s": mystery["setting"],
+        "p": [[s["name"], s["bio"]] for s in mystery["suspects"]],
+        "k": position[mystery["culprit_id"]],
+        "c": [[CATEGORY_LETTERS.get(c["category"], c["category"]), c["text"], [position[sid] for sid in c["implicates"]]]
+              for c in mystery["clues"]],
+        "r": [r["text"] for r in mystery["red_herrings"]],
+        "w": mystery.get("why_unique", ""),
+    }
@@ -0,0 +1,62 @@
+from typing import Dict, Any, Iterable, List, get_args
+from ..schemas import Category, MysteryOut
+
+# Fixed column order for the suspect x category matrix
+CATEGORIES = list(get_args(Category))
+
+
+def build_evidence_matrix(mystery: MysteryOut) -> Dict[str, Any]:
+    """Count how many clues of each category implicate each suspect."""
+    sids = [s.id for s in mystery.suspects]
+    rows = {sid: [0] * len(CATEGORIES) for sid in sids}
+    for clue in mystery.clues:
+        col = CATEGORIES.index(clue.category)
+        for sid in clue.implicates:
+            rows[sid][col] += 1
+
+    return {"suspects": sids, "categories": CATEGORIES, "counts": [rows[sid] for sid in sids]}
+
+
+def build_hints(matrix: Dict[str, Any], culprit_id: str) -> List[Dict[str, str]]:
+    """
+    Progressive hints ordered from most to least obvious.
+
+    Each hint clears one innocent suspect by naming the category where the
+    culprit's evidence most outweighs theirs. At least two suspects are always
+    left uncleared so the hints never single out the culprit.
+    """
+    sids, categories, counts = matrix["suspects"], matrix["categories"], matrix["counts"]
+    if culprit_id not in sids:
+        return []
+    culprit_row = counts[sids.index(culprit_id)]
+
+    innocents = [(sid, row) for sid, row in zip(sids, counts) if sid != culprit_id]
+    innocents.sort(key=lambda item: sum(item[1]))
+
+    hints = []
+    for sid, row in innocents[:max(len(sids) - 2, 0)]:
+        gaps = [c - r for c, r in zip(culprit_row, row)]
+        category = categories[gaps.index(max(gaps))]
+        hints.append({
+            "suspect_id": sid,
+            "category": category,
+            "text": f"Clues in the {category} category point away from {sid}.",
+        })
+    return hints
+
+
+def evidence_margin(matrix: Dict[str, Any], culprit_id: str) -> int:
+    """How many more clues implicate the culprit than the strongest decoy."""
+    sids, counts = matrix["suspects"], matrix["counts"]
+    totals = [sum(row) for row in counts]
+    culprit_total = totals[sids.index(culprit_id)]
+    runner_up = max((t for sid, t in zip(sids, totals) if sid != culprit_id), default=0)
+    return culprit_total - runner_up
+
+
+def evidence_margins(rows: Iterable[tuple]) -> Dict[int, int]:
+    """
+    Margins for many cases at once, e.g. for difficulty analytics:
+    evidence_margins(Case.objects.values_list("id", "evidence_matrix", "culprit_id_hidden").iterator())
+    """
+    return {pk: evidence_margin(matrix, culprit) for pk, matrix, culprit in rows if matrix}
@@ -0,0 +1,80 @@
+import json
+from collections import defaultdict
+from itertools import islice
+from typing import Dict, Any, AsyncIterator, Iterator, Tuple
+from asgiref.sync import sync_to_async
+from django.db.models import QuerySet
+from ..models import Case, Suspect, Clue, ClueImplication, RedHerring
+
+def _group_by_case(queryset: QuerySet) -> dict:
+    """Group (case_id, *values) rows into {case_id: [values, ...]} keeping row order."""
+    grouped = defaultdict(list)
+    for case_id, *values in queryset:
+        grouped[case_id].append(values)
+    return grouped
+
+
+def iter_case_dicts(queryset: QuerySet = None, chunk_size: int = 500) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Yield (pk, mystery) for each case, in the MysteryOut shape (plus difficulty).
+
+    Cases are read in primary-key order, chunk_size at a time using keyset
+    pagination, with one values() query per child table per chunk, so memory
+    stays flat no matter how many cases there are.
+    """
+    queryset = (Case.objects.all() if queryset is None else queryset).order_by('pk')
+    last_pk = 0
+
+    while True:
+        cases = list(
+            queryset.filter(pk__gt=last_pk)
+            .values_list('pk', 'title', 'setting', 'culprit_id_hidden', 'difficulty')[:chunk_size]
+        )
+        if not cases:
+            return
+        ids = [case[0] for case in cases]
+        last_pk = ids[-1]
+
+        suspects = _group_by_case(Suspect.objects.filter(case_id__in=ids).order_by('pk')
+                                  .values_list('case_id', 'sid', 'name', 'bio'))
+        clues = _group_by_case(Clue.objects.filter(case_id__in=ids).order_by('pk')
+                               .values_list('case_id', 'pk', 'cid', 'category', 'text'))
+        red_herrings = _group_by_case(RedHerring.objects.filter(case_id__in=ids).order_by('pk')
+                                      .values_list('case_id', 'rid', 'text'))
+        implicates = defaultdict(list)
+        for clue_id, sid in (ClueImplication.objects.filter(case_id__in=ids).order_by('pk')
+                             .values_list('clue_id', 'suspect_sid')):
+            implicates[clue_id].append(sid)
+
+        for pk, title, setting, culprit_id, difficulty in cases:
+            yield pk, {
+                "title": title,
+                "setting": setting,
+                "suspects": [{"id": sid, "name": name, "bio": bio} for sid, name, bio in suspects[pk]],
+                "culprit_id": culprit_id,
+                "clues": [
+                    {"id": cid, "category": category, "text": text, "implicates": implicates[clue_pk]}
+                    for clue_pk, cid, category, text in clues[pk]
+                ],
+                "red_herrings": [{"id": rid, "text": text} for rid, text in red_herrings[pk]],
+                "why_unique": "",  # Not stored with the case
+                "difficulty": difficulty,
+            }
+
+
+def iter_case_lines(queryset: QuerySet = None, chunk_size: int = 500) -> Iterator[str]:
+    """Yield one NDJSON line per case."""
+    for _, mystery in iter_case_dicts(queryset, chunk_size):
+        yield json.dumps(mystery, ensure_ascii=False) + "\n"
+
+
+async def aiter_case_lines(queryset: QuerySet = None, chunk_size: int = 500) -> AsyncIterator[str]:
+    """
+    iter_case_lines for ASGI responses. Each chunk of cases is read in the
+    sync thread, so memory stays flat instead of Django buffering a sync
+    iterator into a list.
+    """
+    lines = iter_case_lines(queryset, chunk_size)
+    next_chunk = sync_to_async(lambda: "".join(islice(lines, chunk_size)))
+    while chunk := await next_chunk():
+        yield chunk
@@ -1,11 +1,38 @@
 import os, json
-from typing import Dict, Any
-from openai import OpenAI
+from typing import Callable, Dict, Any, Tuple
+from django.conf import settings
+from openai import AsyncOpenAI
 from ..config import get_difficulty_profile
+from .admission import admission, estimate_tokens
+from .compact_mystery import build_compact_prompt, expand_compact
+from .generation_router import Backend, GenerationRouter
+from .profiling import annotate, sample_thread
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# Per-request timeout, so a hung call fails over instead of hanging
+client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), timeout=settings.LLM_REQUEST_TIMEOUT)
 
-def generate_mystery_plot(*, difficulty: str) -> Dict[str, Any]:
+# "compact" asks for short keys and server-assigned ids, then expands them (fewer output tokens)
+COMPACT = settings.MYSTERY_WIRE_FORMAT == "compact"
+
+def openai_backend(model: str, parse: Callable[[Dict[str, Any]], Dict[str, Any]] = None) -> Backend:
+    async def call(system: str, user: str) -> Dict[str, Any]:
+        response = await client.chat.completions.create(
+            model=model,
+            messages=[{"role":"system","content":system},{"role":"user","content":user}],
+            response_format={"type":"json_object"}  # ask for a JSON object
+            )
+        data = json.loads(response.choices[0].message.content)
+        return parse(data) if parse else data
+    return Backend(model, call)
+
+# Primary model first, hedges after it
+router = GenerationRouter(
+    [openai_backend(model, expand_compact if COMPACT else None) for model in settings.MYSTERY_MODELS],
+    hedge_percentile=settings.MYSTERY_HEDGE_PERCENTILE,
+    default_delay=settings.MYSTERY_HEDGE_DEFAULT_DELAY,
+)
+
+def build_prompt(difficulty: str) -> Tuple[str, str]:
     diff, profile = get_difficulty_profile(difficulty)
 
     num_suspects = profile['num_suspects']
@@ -44,12 +71,22 @@ def generate_mystery_plot(*, difficulty: str) -> Dict[str, Any]:
     }}
     """
 
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",  # This model supports JSON mode
-        messages=[{"role":"system","content":system},{"role":"user","content":user}],
-        response_format={"type":"json_object"}  # ask for a JSON object
-        )
-    
-    content = response.choices[0].message.content
+    return system, user
 
-    return json.loads(content)
\ No newline at end of file
+def generate_mystery_plot(*, difficulty: str, priority: str = "user") -> Dict[str, Any]:
+    """Raises AdmissionRejected when outbound LLM capacity is saturated."""
+    system, user = build_compact_prompt(difficulty) if COMPACT else build_prompt(difficulty)
+    _, profile = get_difficulty_profile(difficulty)
+    estimate = estimate_tokens(system, user, profile)
+    with admission.admit(estimate, priority=priority):
+        trace = []
+        try:
+            # Finish before the admission slot's TTL runs out and another request can take it.
+            # Hedges and failovers are admitted (and charged) call by call.
+            with sample_thread(router.THREAD_NAME):  # Profile the router while it works for us
+                return router.generate(
+                    system, user, timeout=settings.LLM_REQUEST_TIMEOUT, trace=trace,
+                    admit_extra=lambda needs_slot: admission.try_admit(estimate, slot=needs_slot),
+                )
+        finally:
+            annotate("generation", trace)  # Per-backend timings, for request profiles
@@ -0,0 +1,167 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from pydantic import ValidationError
+from .validate_mystery import validate_mystery
+
+BackendCall = Callable[[str, str], Awaitable[Dict[str, Any]]]
+# admit_extra(needs_slot) -> release callable, or None if the call may not be made
+AdmitExtra = Callable[[bool], Optional[Callable[[], None]]]
+
+
+class Backend:
+    """A model/provider that can generate a mystery, with a rolling window of its latencies."""
+
+    def __init__(self, name: str, call: BackendCall, window: int = 200):
+        self.name = name
+        self.call = call
+        self.latencies = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self.latencies.append(seconds)
+
+    def percentile(self, p: float) -> float:
+        ordered = sorted(self.latencies)
+        return ordered[int(p * (len(ordered) - 1))]
+
+
+class GenerationRouter:
+    """
+    Hedged generation across backends, to cut tail latency.
+
+    The first backend is asked first. If it hasn't answered within its own
+    hedge_percentile latency (default_delay until min_samples calls have been
+    seen), the next backend is asked too, and so on. A failed or invalid
+    answer fires the next backend straight away. The first answer that passes
+    validate_mystery wins and the remaining requests are cancelled.
+
+    The caller admits the first call. If admit_extra is given, every later
+    call (hedge or failover) must be admitted by it too. A call that would
+    overlap the caller's call asks for its own slot. A call that replaces a
+    finished one reuses that slot but still has its tokens charged. Calls
+    that are not admitted are skipped.
+
+    Requests run on one long-lived event loop in a background thread so that
+    backends can keep their HTTP connection pools between calls.
+    """
+
+    THREAD_NAME = "generation-router"
+
+    def __init__(self, backends: List[Backend], hedge_percentile: float = 0.9,
+                 default_delay: float = 10.0, min_samples: int = 20):
+        self.backends = backends
+        self.hedge_percentile = hedge_percentile
+        self.default_delay = default_delay
+        self.min_samples = min_samples
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    def hedge_delay(self) -> float:
+        primary = self.backends[0]
+        if len(primary.latencies) < self.min_samples:
+            return self.default_delay
+        return primary.percentile(self.hedge_percentile)
+
+    def generate(self, system: str, user: str, timeout: Optional[float] = None,
+                 trace: Optional[List[Dict[str, Any]]] = None,
+                 admit_extra: Optional[AdmitExtra] = None) -> Dict[str, Any]:
+        """Blocking entry point for sync views. Raises TimeoutError, cancelling every backend, after timeout seconds."""
+        coro = asyncio.wait_for(self.agenerate(system, user, trace, admit_extra), timeout)
+        return asyncio.run_coroutine_threadsafe(coro, self._get_loop()).result()
+
+    async def agenerate(self, system: str, user: str,
+                        trace: Optional[List[Dict[str, Any]]] = None,
+                        admit_extra: Optional[AdmitExtra] = None) -> Dict[str, Any]:
+        """Pass trace to collect one {backend, outcome, started_ms, ms} entry per backend asked."""
+        waiting = list(self.backends)
+        pending = {}  # task -> (backend, started, release, in caller's slot)
+        last_invalid, last_error = None, None
+        t0 = time.perf_counter()
+        first = True
+        caller_slot_free = False
+
+        def note(backend, started, outcome):
+            if trace is not None:
+                now = time.perf_counter()
+                trace.append({"backend": backend.name, "outcome": outcome,
+                              "started_ms": round((started - t0) * 1000), "ms": round((now - started) * 1000)})
+
+        async def launch():
+            """Start the next backend that can be admitted; False if none could."""
+            nonlocal first, caller_slot_free
+            while waiting:
+                backend = waiting.pop(0)
+                in_caller_slot = first or caller_slot_free
+                release = None
+                if not first and admit_extra is not None:
+                    # Cache round trips, so off the event loop
+                    release = await asyncio.get_running_loop().run_in_executor(
+                        None, admit_extra, not in_caller_slot)
+                    if release is None:
+                        note(backend, time.perf_counter(), "not admitted")
+                        continue
+                first = False
+                if in_caller_slot:
+                    caller_slot_free = False
+                task = asyncio.ensure_future(backend.call(system, user))
+                pending[task] = (backend, time.perf_counter(), release, in_caller_slot)
+                return True
+            return False
+
+        def finish(task):
+            nonlocal caller_slot_free
+            backend, started, release, in_caller_slot = pending.pop(task)
+            if release is not None:
+                release()
+            if in_caller_slot:
+                caller_slot_free = True
+            return backend, started
+
+        await launch()
+        try:
+            while pending:
+                timeout = self.hedge_delay() if waiting else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    await launch()  # Hedge
+                    continue
+
+                for task in done:
+                    backend, started = finish(task)
+                    try:
+                        raw = task.result()
+                    except Exception as e:
+                        last_error = e
+                        note(backend, started, "error")
+                    else:
+                        backend.record(time.perf_counter() - started)
+                        try:
+                            validate_mystery(raw)
+                            note(backend, started, "ok")
+                            return raw
+                        except (AssertionError, ValidationError):
+                            last_invalid = raw
+                            note(backend, started, "invalid")
+                    if waiting:
+                        await launch()
+        finally:
+            for task in list(pending):
+                backend, started = finish(task)
+                task.cancel()
+                # Lower bound on how long it would have taken; keeps slow backends from looking fast
+                backend.record(time.perf_counter() - started)
+                note(backend, started, "cancelled")
+
+        # Nothing valid: hand back an invalid answer so the caller reports it, else the error
+        if last_invalid is not None:
+            return last_invalid
+        raise last_error
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name=self.THREAD_NAME, daemon=True).start()
+            return self._loop
@@ -0,0 +1,118 @@
+import csv
+import io
+import json
+from typing import Iterable, List, Tuple, Callable, Optional
+from django.db import connection, transaction
+from pydantic import ValidationError
+from ..config import DIFFICULTY_PROFILES, get_difficulty_profile
+from ..models import Case, Suspect, Clue, ClueImplication, RedHerring
+from ..schemas import MysteryOut
+from .evidence_matrix import build_evidence_matrix
+from .validate_mystery import validate_mystery
+
+def import_case_lines(lines: Iterable[str], batch_size: int = 1000,
+                      on_error: Optional[Callable[[int, str], None]] = None) -> Tuple[int, int]:
+    """
+    Validate NDJSON case lines (as written by export_cases) and insert them in batches.
+    Invalid lines are skipped and reported through on_error(line_number, message).
+    Returns (imported, skipped).
+    """
+    imported = skipped = 0
+    batch: List[Tuple[MysteryOut, str]] = []
+
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            raw = json.loads(line)
+            batch.append((validate_mystery(raw), line_difficulty(raw)))
+        except (ValueError, ValidationError, AssertionError, AttributeError) as e:
+            skipped += 1
+            if on_error:
+                on_error(line_number, str(e))
+            continue
+
+        if len(batch) >= batch_size:
+            imported += insert_mysteries(batch)
+            batch = []
+
+    if batch:
+        imported += insert_mysteries(batch)
+
+    return imported, skipped
+
+
+def line_difficulty(raw: dict) -> str:
+    """The line's difficulty (medium if absent). Raises ValueError if it isn't a known difficulty."""
+    difficulty = raw.get("difficulty") or "medium"
+    if not isinstance(difficulty, str) or difficulty.lower() not in DIFFICULTY_PROFILES:
+        raise ValueError(f"Unknown difficulty {difficulty!r}")
+    return difficulty.lower()
+
+
+def insert_mysteries(batch: List[Tuple[MysteryOut, str]], pks: Optional[List[int]] = None) -> int:
+    """
+    Insert a batch of validated mysteries and all their children in one transaction.
+    Pass pks to restore cases under their original ids (e.g. when rehydrating archives).
+    """
+    with transaction.atomic():
+        cases = []
+        for i, (mystery, difficulty) in enumerate(batch):
+            diff, profile = get_difficulty_profile(difficulty)
+            cases.append(Case(
+                pk=pks[i] if pks else None,
+                title=mystery.title,
+                setting=mystery.setting,
+                culprit_id_hidden=mystery.culprit_id,
+                difficulty=diff,
+                num_suspects=profile['num_suspects'],
+                num_clues=profile['num_clues'],
+                num_red_herrings=profile['num_red_herrings'],
+                evidence_matrix=build_evidence_matrix(mystery),
+            ))
+        # Cases and clues need their primary keys back, so they go through bulk_create
+        Case.objects.bulk_create(cases)
+
+        suspects, clues, clue_sids, red_herrings = [], [], [], []
+        for case, (mystery, _) in zip(cases, batch):
+            suspects += [(case.pk, s.id, s.name, s.bio) for s in mystery.suspects]
+            for clue in mystery.clues:
+                clues.append(Clue(case_id=case.pk, cid=clue.id, category=clue.category, text=clue.text))
+                clue_sids.append(clue.implicates)
+            red_herrings += [(case.pk, r.id, r.text) for r in mystery.red_herrings]
+        Clue.objects.bulk_create(clues)
+
+        implications = [
+            (clue.case_id, clue.pk, sid)
+            for clue, sids in zip(clues, clue_sids) for sid in sids
+        ]
+
+        # Leaf tables skip model instances entirely and go in as raw rows
+        insert_rows(Suspect, ['case_id', 'sid', 'name', 'bio'], suspects)
+        insert_rows(RedHerring, ['case_id', 'rid', 'text'], red_herrings)
+        insert_rows(ClueImplication, ['case_id', 'clue_id', 'suspect_sid'], implications)
+
+    return len(cases)
+
+
+def insert_rows(model, fields: List[str], rows: List[tuple]) -> None:
+    """
+    Insert plain value tuples into a model's table, leaving primary keys to the database.
+    Uses COPY ... FROM STDIN on Postgres and a single executemany() elsewhere.
+    """
+    if not rows:
+        return
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    columns = ", ".join(quote(model._meta.get_field(f).column) for f in fields)
+
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            buffer = io.StringIO()
+            # Quote everything so empty strings are not read back as NULL
+            csv.writer(buffer, quoting=csv.QUOTE_ALL).writerows(rows)
+            buffer.seek(0)
+            cursor.copy_expert(f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+        else:
+            placeholders = ", ".join(["%s"] * len(fields))
+            cursor.executemany(f"INSERT INTO {table} ({columns}) VALUES ({placeholders})", rows)
@@ -0,0 +1,217 @@
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+from django.conf import settings
+from django.db import connection
+
+# Cap on recorded queries per capture, so a runaway request can't balloon memory
+MAX_SQL = 500
+MAX_DEPTH = 64
+
+CAPTURE_NAME = re.compile(r'^(?P<ts>\d+)-(?P<reason>sampled|slow)-(?P<view>\w+)-(?P<ms>\d+)ms\.json$')
+
+
+class Target:
+    """Samples for one profiled request thread, plus any shared threads it is waiting on."""
+
+    def __init__(self):
+        self.stacks = Counter()
+        self.background = Counter()
+        self.waiting_on: List[str] = []  # Names of shared threads doing this request's work right now
+
+
+class Sampler:
+    """
+    Stack sampler shared by all profiled requests.
+
+    One background thread wakes every `interval` seconds while any thread is
+    registered, reads that thread's current frame and counts its folded stack
+    ("outer;...;inner", the flame graph format). While a request is inside
+    sample_thread(name), that shared thread is sampled too, into separate
+    background stacks rooted at its name. It sleeps when nothing is
+    registered.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._targets: Dict[int, Target] = {}
+        self._lock = threading.Lock()
+        self._active = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, ident: int) -> Target:
+        target = Target()
+        with self._lock:
+            self._targets[ident] = target
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+                self._thread.start()
+            self._active.set()
+        return target
+
+    def stop(self, ident: int) -> Target:
+        with self._lock:
+            target = self._targets.pop(ident, Target())
+            if not self._targets:
+                self._active.clear()
+        return target
+
+    def _run(self) -> None:
+        while True:
+            self._active.wait()
+            time.sleep(self.interval)
+            with self._lock:
+                targets = list(self._targets.items())
+            frames = sys._current_frames()
+            shared = None
+            for ident, target in targets:
+                frame = frames.get(ident)
+                if frame is not None:
+                    target.stacks[fold(frame)] += 1
+                for name in list(target.waiting_on):
+                    if shared is None:
+                        shared = {t.name: t.ident for t in threading.enumerate()}
+                    frame = frames.get(shared.get(name))
+                    if frame is not None:
+                        target.background[f"{name};{fold(frame)}"] += 1
+
+
+def fold(frame) -> str:
+    parts = []
+    while frame is not None and len(parts) < MAX_DEPTH:
+        code = frame.f_code
+        parts.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ";".join(reversed(parts))
+
+
+sampler = Sampler(settings.PROFILE_INTERVAL)
+_local = threading.local()
+
+
+@contextmanager
+def sample_thread(name: str):
+    """
+    While the block runs, also sample the shared thread called `name` into this thread's
+    capture, if any (e.g. the generation router's event loop while waiting on generate()).
+    Other requests' work on that thread during the block is included too.
+    """
+    capture = getattr(_local, "capture", None)
+    if capture is None:
+        yield
+        return
+    capture.target.waiting_on.append(name)
+    try:
+        yield
+    finally:
+        capture.target.waiting_on.remove(name)
+
+
+def annotate(key: str, value: Any) -> None:
+    """Attach extra detail (e.g. per-backend generation timings) to this thread's capture, if any."""
+    capture = getattr(_local, "capture", None)
+    if capture is not None:
+        capture.notes[key] = value
+
+
+class Capture:
+    """Stack samples and SQL for one request on the current thread."""
+
+    def __init__(self, view: str, sampled: bool):
+        self.view = view
+        self.sampled = sampled
+        self.sql: List[Dict[str, Any]] = []
+        self.notes: Dict[str, Any] = {}
+        self.ident = threading.get_ident()
+        self.started = time.perf_counter()
+        self.target = sampler.start(self.ident)
+        connection.execute_wrappers.append(self._record_sql)
+        _local.capture = self
+
+    def _record_sql(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            if len(self.sql) < MAX_SQL:
+                # Statement only - parameters may hold player data
+                self.sql.append({"sql": sql, "ms": round((time.perf_counter() - started) * 1000, 2)})
+
+    def finish(self, request, response) -> Optional[str]:
+        """Stop profiling; store the capture if it was sampled or slow. Returns the capture name."""
+        target = sampler.stop(self.ident)
+        _local.capture = None
+        if self._record_sql in connection.execute_wrappers:
+            connection.execute_wrappers.remove(self._record_sql)
+
+        duration_ms = (time.perf_counter() - self.started) * 1000
+        slow = settings.PROFILE_SLOW_MS > 0 and duration_ms >= settings.PROFILE_SLOW_MS
+        if not (self.sampled or slow):
+            return None
+
+        return save_capture({
+            "view": self.view,
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "reason": "slow" if slow else "sampled",
+            "duration_ms": round(duration_ms, 1),
+            "interval_ms": settings.PROFILE_INTERVAL * 1000,
+            "samples": sum(target.stacks.values()),
+            "stacks": dict(target.stacks.most_common()),
+            "background_samples": sum(target.background.values()),
+            "background_stacks": dict(target.background.most_common()),
+            "sql": self.sql,
+            **self.notes,
+        })
+
+
+def _store() -> Path:
+    path = Path(settings.PROFILE_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def save_capture(data: Dict[str, Any]) -> str:
+    """Write a capture and drop the oldest ones beyond PROFILE_MAX_CAPTURES."""
+    store = _store()
+    name = f"{int(time.time() * 1000)}-{data['reason']}-{data['view']}-{int(data['duration_ms'])}ms.json"
+    tmp = store / f".{name}.tmp"
+    tmp.write_text(json.dumps(data), encoding="utf-8")
+    os.replace(tmp, store / name)
+
+    for old in list_captures()[settings.PROFILE_MAX_CAPTURES:]:
+        (store / old["name"]).unlink(missing_ok=True)
+    return name
+
+
+def list_captures() -> List[Dict[str, Any]]:
+    """Captures newest first, described from their file names alone."""
+    captures = []
+    for name in os.listdir(_store()):
+        match = CAPTURE_NAME.match(name)
+        if match:
+            captures.append({
+                "name": name,
+                "view": match["view"],
+                "reason": match["reason"],
+                "duration_ms": int(match["ms"]),
+                "captured_at": int(match["ts"]) / 1000,
+            })
+    captures.sort(key=lambda c: c["name"], reverse=True)
+    return captures
+
+
+def capture_path(name: str) -> Optional[Path]:
+    """Path of a stored capture, or None if the name is not a capture in the store."""
+    if not CAPTURE_NAME.match(name):
+        return None
+    path = _store() / name
+    return path if path.exists() else None
@@ -0,0 +1,91 @@
+import json
+import time
+import zlib
+from datetime import timedelta
+from typing import Optional, Tuple
+from django.db import connection, transaction
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+from ..models import Case, ArchivedCase
+from .export_cases import iter_case_dicts
+from .import_cases import insert_mysteries
+from .validate_mystery import validate_mystery
+
+# How stale last_viewed_at may get before a view writes it again
+VIEW_REFRESH_INTERVAL = timedelta(days=1)
+
+# Postgres lock_timeout for each purge batch, so a purge never queues behind live traffic for long
+PURGE_LOCK_TIMEOUT = '2s'
+
+
+def touch_case(case: Case) -> None:
+    """Record a view of the case, writing at most once per VIEW_REFRESH_INTERVAL."""
+    now = timezone.now()
+    if case.last_viewed_at is None or now - case.last_viewed_at >= VIEW_REFRESH_INTERVAL:
+        Case.objects.filter(pk=case.pk).update(last_viewed_at=now)
+        case.last_viewed_at = now
+
+
+def stale_cases(unviewed_days: Optional[int] = None, older_than_days: Optional[int] = None) -> QuerySet:
+    """Cases not viewed in the last unviewed_days days, or created more than older_than_days ago."""
+    now = timezone.now()
+    condition = Q(pk__in=[])
+    if unviewed_days is not None:
+        cutoff = now - timedelta(days=unviewed_days)
+        condition |= Q(last_viewed_at__lt=cutoff) | Q(last_viewed_at__isnull=True, created_at__lt=cutoff)
+    if older_than_days is not None:
+        condition |= Q(created_at__lt=now - timedelta(days=older_than_days))
+    return Case.objects.filter(condition)
+
+
+def purge_batch(stale: QuerySet, batch_size: int, archive: bool = False) -> Tuple[int, int, float]:
+    """
+    Delete (and optionally archive) up to batch_size stale cases in one short transaction.
+    Cases already locked by live traffic are skipped rather than waited on.
+    Returns (cases purged, rows deleted, seconds spent in the cascading DELETE), where
+    the DELETE time includes any wait for child-row locks, bounded by PURGE_LOCK_TIMEOUT.
+    """
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(f"SET LOCAL lock_timeout = '{PURGE_LOCK_TIMEOUT}'")
+
+        ids = list(stale.order_by('pk').select_for_update(skip_locked=True)
+                   .values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return 0, 0, 0.0
+
+        if archive:
+            cases = Case.objects.filter(pk__in=ids)
+            created = dict(cases.values_list('pk', 'created_at'))
+            ArchivedCase.objects.bulk_create([
+                ArchivedCase(
+                    id=pk,
+                    title=mystery['title'],
+                    difficulty=mystery['difficulty'],
+                    created_at=created[pk],
+                    payload=zlib.compress(json.dumps(mystery, ensure_ascii=False).encode()),
+                )
+                for pk, mystery in iter_case_dicts(cases, chunk_size=batch_size)
+            ], ignore_conflicts=True)
+
+        started = time.perf_counter()
+        rows, _ = Case.objects.filter(pk__in=ids).delete()
+        delete_time = time.perf_counter() - started
+
+    return len(ids), rows, delete_time
+
+
+def rehydrate_case(pk: int) -> bool:
+    """Restore an archived case under its original id. Returns False if there is no archive for it."""
+    with transaction.atomic():
+        archived = ArchivedCase.objects.select_for_update().filter(pk=pk).first()
+        if archived is None:
+            return False
+        raw = json.loads(zlib.decompress(bytes(archived.payload)))
+        insert_mysteries([(validate_mystery(raw), raw.get('difficulty') or 'medium')], pks=[pk])
+        # created_at is auto_now_add, so restore the original age after the insert. Restoring
+        # counts as a view, so the next unviewed purge doesn't archive it straight away.
+        Case.objects.filter(pk=pk).update(created_at=archived.created_at, last_viewed_at=timezone.now())
+        archived.delete()
+    return True
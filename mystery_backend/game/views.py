@@ -1,7 +1,10 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.permissions import IsAdminUser
 from rest_framework.throttling import AnonRateThrottle, UserRateThrottle
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.db import transaction
 from drf_spectacular.utils import extend_schema, OpenApiParameter
@@ -10,7 +13,13 @@ from drf_spectacular.types import OpenApiTypes
 from .config import get_difficulty_profile
 from .models import Case, Suspect, Clue, ClueImplication, RedHerring
 from .serializers import CasePublicSerializer
+from .utils.admission import AdmissionRejected, admission
+from .utils.check_guess import check_guess
+from .utils.evidence_matrix import build_evidence_matrix, build_hints
+from .utils.export_cases import aiter_case_lines, iter_case_lines
 from .utils.generate_mystery import generate_mystery_plot
+from .utils.profiling import capture_path, list_captures
+from .utils.retention import rehydrate_case, touch_case
 from .utils.validate_mystery import validate_mystery
 
 # Custom throttle classes to control API usage and costs
@@ -26,6 +35,10 @@ class GuessThrottle(AnonRateThrottle):
     """Moderate limit for guess submissions"""
     scope = 'guess'
 
+class HintThrottle(AnonRateThrottle):
+    """Limit for hint requests"""
+    scope = 'hint'
+
 class CaseCreateAPIView(APIView):
     """Creates new mystery cases using OpenAI API"""
     throttle_classes = [CaseCreateThrottle, UserRateThrottle]
@@ -53,6 +66,14 @@ class CaseCreateAPIView(APIView):
             400: {
                 'description': 'Bad request - validation error',
                 'example': {'error': 'Invalid mystery data'}
+            },
+            503: {
+                'description': 'Generation capacity saturated - retry after the Retry-After header',
+                'example': {'error': 'Mystery generation is busy (concurrency limit reached), try again shortly'}
+            },
+            504: {
+                'description': 'Generation timed out - retry after the Retry-After header',
+                'example': {'error': 'Mystery generation took too long, try again shortly'}
             }
         }
     )
@@ -62,7 +83,18 @@ class CaseCreateAPIView(APIView):
         diff, profile = get_difficulty_profile(difficulty)
 
         # Generate mystery using OpenAI API
-        raw_mystery = generate_mystery_plot(difficulty=diff)
+        try:
+            raw_mystery = generate_mystery_plot(difficulty=diff)
+        except AdmissionRejected as e:
+            # Outbound LLM capacity is saturated - tell the client when to come back
+            return Response({"error": f"Mystery generation is busy ({e.reason}), try again shortly"},
+                            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            headers={"Retry-After": str(e.retry_after)})
+        except TimeoutError:
+            # Cut off at LLM_REQUEST_TIMEOUT so it can't outlive its admission slot
+            return Response({"error": "Mystery generation took too long, try again shortly"},
+                            status=status.HTTP_504_GATEWAY_TIMEOUT,
+                            headers={"Retry-After": str(admission.retry_after)})
 
         # Validate the AI generated data structure
         try:
@@ -81,6 +113,7 @@ class CaseCreateAPIView(APIView):
                 num_suspects=profile['num_suspects'],
                 num_clues=profile['num_clues'],
                 num_red_herrings=profile['num_red_herrings'],
+                evidence_matrix=build_evidence_matrix(validated_mystery),
             )
 
             # Create suspects
@@ -118,7 +151,12 @@ class CaseDetailAPIView(APIView):
         }
     )
     def get(self, request, pk):
-        case = get_object_or_404(Case, pk=pk)
+        case = Case.objects.filter(pk=pk).first()
+        if case is None:
+            # Bring back archived cases transparently when someone opens them again
+            rehydrate_case(pk)
+            case = get_object_or_404(Case, pk=pk)
+        touch_case(case)
         # Use public serializer to hide culprit identity
         return Response(CasePublicSerializer(case).data)
 
@@ -231,21 +269,160 @@ class GuessAPIView(APIView):
     )
     def post(self, request, pk):
         case = get_object_or_404(Case, pk=pk)
-        suspect_id = request.data.get("suspect_id")
-        
-        # Validate suspect_id is provided
-        if not suspect_id:
-            return Response({"error": "suspect_id is required"}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Validate suspect_id exists in this case
-        if not Suspect.objects.filter(case=case, sid=suspect_id).exists():
-            return Response({"error": "Invalid suspect_id for this case"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            result = check_guess(case, request.data.get("suspect_id"))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(result, status=status.HTTP_200_OK)
+
+
+class HintAPIView(APIView):
+    """Serves progressive hints from the case's precomputed evidence matrix."""
+    throttle_classes = [HintThrottle, UserRateThrottle]
+
+    @extend_schema(
+        operation_id='get_hint',
+        summary='Get hints for a mystery case',
+        description='Reveal hints one level at a time. Each level clears one more innocent suspect; '
+                    'at least two suspects always remain so the culprit is never given away.',
+        parameters=[
+            OpenApiParameter(
+                name='level',
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description='Number of hints to reveal',
+                default=1,
+                required=False,
+            )
+        ],
+        responses={
+            200: {
+                'description': 'Hints revealed so far',
+                'example': {
+                    'level': 1,
+                    'max_level': 3,
+                    'hints': [
+                        {'suspect_id': 'S4', 'category': 'forensic', 'text': 'Clues in the forensic category point away from S4.'}
+                    ]
+                }
+            },
+            400: {
+                'description': 'Bad request',
+                'example': {'error': 'level must be a positive integer'}
+            },
+            404: {
+                'description': 'Case not found',
+                'example': {'detail': 'Not found.'}
+            }
+        }
+    )
+    def get(self, request, pk):
+        case = get_object_or_404(Case.objects.only('evidence_matrix', 'culprit_id_hidden'), pk=pk)
+
+        try:
+            level = int(request.query_params.get('level', 1))
+        except ValueError:
+            level = 0
+        if level < 1:
+            return Response({"error": "level must be a positive integer"}, status=status.HTTP_400_BAD_REQUEST)
+
+        hints = build_hints(case.evidence_matrix, case.culprit_id_hidden) if case.evidence_matrix else []
 
-        # Compare guess with hidden culprit identity
-        is_correct = suspect_id == case.culprit_id_hidden
-        
-        # Return result with personalized feedback
         return Response({
-            "correct": is_correct,
-            "message": f"Congratulations! You solved the mystery. {suspect_id} was indeed the culprit!" if is_correct else f"Incorrect! {suspect_id} is not the culprit. Keep investigating!"
+            "level": min(level, len(hints)),
+            "max_level": len(hints),
+            "hints": hints[:level],
         }, status=status.HTTP_200_OK)
+
+
+class CaseExportAPIView(APIView):
+    """Streams every case as NDJSON for backup and migration (staff only)."""
+    permission_classes = [IsAdminUser]
+
+    @extend_schema(
+        operation_id='export_cases',
+        summary='Export all cases as NDJSON',
+        description='Stream every case, one JSON object per line, in the same shape as the generated mysteries '
+                    '(including the culprit). Load it back with `manage.py import_cases`. Staff only.',
+        responses={
+            (200, 'application/x-ndjson'): OpenApiTypes.STR,
+            403: {
+                'description': 'Not a staff user',
+                'example': {'detail': 'You do not have permission to perform this action.'}
+            }
+        }
+    )
+    def get(self, request):
+        # Under ASGI Django buffers sync iterators into a list, so stream asynchronously there
+        lines = aiter_case_lines() if isinstance(request._request, ASGIRequest) else iter_case_lines()
+        response = StreamingHttpResponse(lines, content_type='application/x-ndjson')
+        response['Content-Disposition'] = 'attachment; filename="cases.ndjson"'
+        return response
+
+
+class AdmissionMetricsAPIView(APIView):
+    """Current state of the outbound LLM admission controller (staff only)."""
+    permission_classes = [IsAdminUser]
+
+    @extend_schema(
+        operation_id='admission_metrics',
+        summary='LLM admission controller metrics',
+        description='In-flight generations, queue depth, token budget use and admit/reject counters. Staff only.',
+        responses={
+            200: {
+                'description': 'Limiter state',
+                'example': {
+                    'in_flight': 3, 'max_concurrency': 8, 'waiting': 0, 'max_queue': 20,
+                    'tokens_this_minute': 12400, 'tokens_per_minute': 200000,
+                    'admitted_total': 1520, 'rejected_total': 4, 'extra_calls_skipped_total': 12
+                }
+            }
+        }
+    )
+    def get(self, request):
+        return Response(admission.stats())
+
+
+class ProfileListAPIView(APIView):
+    """Stored request profiles, newest first (staff only)."""
+    permission_classes = [IsAdminUser]
+
+    @extend_schema(
+        operation_id='list_profiles',
+        summary='List request profiles',
+        description='Profiles captured by the opt-in profiling middleware (PROFILE_SAMPLE_RATE / PROFILE_SLOW_MS), '
+                    'newest first. Download one from `/api/profiles/<name>/`. Staff only.',
+        responses={
+            200: {
+                'description': 'Stored captures',
+                'example': [{
+                    'name': '1760870400000-slow-CaseCreateAPIView-8421ms.json', 'view': 'CaseCreateAPIView',
+                    'reason': 'slow', 'duration_ms': 8421, 'captured_at': 1760870400.0
+                }]
+            }
+        }
+    )
+    def get(self, request):
+        return Response(list_captures())
+
+
+class ProfileDownloadAPIView(APIView):
+    """Downloads one stored request profile (staff only)."""
+    permission_classes = [IsAdminUser]
+
+    @extend_schema(
+        operation_id='download_profile',
+        summary='Download a request profile',
+        description='JSON with the folded stack samples (flame graph format) and the SQL the request ran. Staff only.',
+        responses={
+            (200, 'application/json'): OpenApiTypes.OBJECT,
+            404: {'description': 'No such capture', 'example': {'detail': 'Not found.'}}
+        }
+    )
+    def get(self, request, name):
+        path = capture_path(name)
+        if path is None:
+            raise Http404
+        return FileResponse(open(path, 'rb'), as_attachment=True, filename=name, content_type='application/json')
@@ -40,6 +40,7 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'rest_framework',
     'drf_spectacular',
+    'channels',
     'game',
 ]
 
@@ -59,9 +60,24 @@ REST_FRAMEWORK = {
         "case_create": "20/hour",    
         "case_view": "100/hour",     
         "guess": "50/hour",          
+        "hint": "50/hour",
     },
 }
 
+# Mystery generation - first model is primary, the rest are hedges fired when it runs slow
+MYSTERY_MODELS = [m.strip() for m in os.getenv("MYSTERY_MODELS", "gpt-4o-mini,gpt-4.1-mini").split(",") if m.strip()]
+MYSTERY_HEDGE_PERCENTILE = float(os.getenv("MYSTERY_HEDGE_PERCENTILE", "0.9"))
+MYSTERY_HEDGE_DEFAULT_DELAY = float(os.getenv("MYSTERY_HEDGE_DEFAULT_DELAY", "10"))
+# Outbound LLM admission control, shared across workers through the cache
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", "200000"))
+LLM_MAX_QUEUE = int(os.getenv("LLM_MAX_QUEUE", "20"))
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "10"))
+LLM_SLOT_TTL = int(os.getenv("LLM_SLOT_TTL", "120"))  # Longest a generation may hold a slot
+LLM_REQUEST_TIMEOUT = float(os.getenv("LLM_REQUEST_TIMEOUT", "100"))  # Keep below LLM_SLOT_TTL
+# "verbose" (full MysteryOut JSON) or "compact" (short keys, server-assigned ids)
+MYSTERY_WIRE_FORMAT = os.getenv("MYSTERY_WIRE_FORMAT", "verbose")
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "Dead Giveaway - A Mystery Game API",
     "DESCRIPTION": "Generate and play AI-created mystery cases.",
@@ -80,6 +96,18 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Opt-in request profiling (see game/utils/profiling.py). Off unless a sample
+# rate or slow threshold is set, in which case the middleware is installed.
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))  # Fraction of requests always captured
+PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", "0"))  # Capture any request slower than this
+PROFILE_VIEWS = os.getenv("PROFILE_VIEWS", "CaseCreateAPIView,CaseDetailAPIView,GuessAPIView").split(",")
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL_MS", "5")) / 1000
+PROFILE_DIR = os.getenv("PROFILE_DIR", str(BASE_DIR / "profiles"))
+PROFILE_MAX_CAPTURES = int(os.getenv("PROFILE_MAX_CAPTURES", "200"))
+
+if PROFILE_SAMPLE_RATE > 0 or PROFILE_SLOW_MS > 0:
+    MIDDLEWARE.append('game.middleware.ProfilingMiddleware')
+
 ROOT_URLCONF = 'mystery_backend.urls'
 
 TEMPLATES = [
@@ -98,6 +126,17 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'mystery_backend.wsgi.application'
+ASGI_APPLICATION = 'mystery_backend.asgi.application'
+
+# Multiplayer rooms - single-process fan-out layer (run one ASGI worker)
+CHANNEL_LAYERS = {
+    'default': {
+        'BACKEND': 'game.channel_layers.FanoutChannelLayer',
+        'CONFIG': {
+            'capacity': int(os.getenv('ROOM_CHANNEL_CAPACITY', '100')),
+        },
+    }
+}
 
 
 # Database - automatically uses Neon if DATABASE_URL exists, SQLite otherwise
@@ -5,7 +5,7 @@ URL configuration for mystery_backend project.
 from django.contrib import admin
 from django.urls import path
 from django.http import HttpResponse
-from game.views import CaseCreateAPIView, CaseDetailAPIView, GuessAPIView
+from game.views import CaseCreateAPIView, CaseDetailAPIView, GuessAPIView, HintAPIView, CaseExportAPIView, AdmissionMetricsAPIView, ProfileListAPIView, ProfileDownloadAPIView
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
 
 def home(request):
@@ -28,8 +28,13 @@ urlpatterns = [
     path("", home, name="home"),
     path("admin/", admin.site.urls),
     path("api/cases/", CaseCreateAPIView.as_view()),
+    path("api/cases/export/", CaseExportAPIView.as_view()),
     path("api/cases/<int:pk>/", CaseDetailAPIView.as_view()),
     path("api/cases/<int:pk>/guess/", GuessAPIView.as_view()),
+    path("api/cases/<int:pk>/hint/", HintAPIView.as_view()),
+    path("api/metrics/admission/", AdmissionMetricsAPIView.as_view()),
+    path("api/profiles/", ProfileListAPIView.as_view()),
+    path("api/profiles/<str:name>/", ProfileDownloadAPIView.as_view()),
 
     # drf_spectacular
     path("api/schema/", SpectacularAPIView.as_view(), name="schema"),